@@ -0,0 +1,9 @@
+#!/bin/bash
+set -e
+
+# Allow the local read replica (docker compose --profile replica) to stream from this database
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" <<-EOSQL
+	create user replicator with replication password 'Rand0m!';
+EOSQL
+
+echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"
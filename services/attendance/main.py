@@ -2,20 +2,26 @@ import aiohttp
 import os
 import urllib
 
+from datetime import date
 from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Boolean, case, delete, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from starlette.status import HTTP_403_FORBIDDEN
 from uuid import UUID
 
+from src.cache import TTLCache
 from src.database import db_url
 from src.errors import DomainError
-from src.schemas.attendance import AttendancePost, AttendanceQuery, AttendanceRead
+from src.schemas.attendance import AttendanceAggregate, AttendanceAggregateQuery, AttendanceBatchPost, AttendanceCascade, AttendanceBatchResult, AttendanceDeleteResult, AttendancePost, AttendanceQuery, AttendanceRead, AttendanceWrite
+from src.schemas.permissions import PermissionsInvalidate
 from src.schemas.token import Token
-from src.members import HttpClient, attempt_attendance, delete_attendance, get_manageable_members
+from src.members import HttpClient, attempt_attendance, attempt_attendances, delete_attendances, get_manageable_members
 from src.middleware.jwt_auth import JWTAuthorisation, JWTConfig
 from src.models.attendance import Attendance, Resolution
+from src.streaming import MEDIA_TYPES, csv_chunks, ndjson_chunks, stream_format
 
 
 def is_local():
@@ -27,9 +33,14 @@ CERT_PATH = os.path.join(os.path.dirname(
 
 app = FastAPI()
 
-sa_engine = create_engine(
-    db_url(os.getenv('PGHOST'), urllib.parse.quote_plus(os.getenv('PGPASS'))))
-session = Session(sa_engine)
+sa_engine = create_async_engine(
+    db_url(os.getenv('PGHOST'), urllib.parse.quote_plus(
+        os.getenv('PGPASS')), driver='asyncpg'),
+    pool_size=int(os.getenv('PGPOOL_SIZE', 10)),
+    max_overflow=int(os.getenv('PGPOOL_MAX_OVERFLOW', 10)),
+    pool_timeout=10,
+    pool_pre_ping=True)
+async_session = async_sessionmaker(sa_engine, expire_on_commit=False)
 
 app.add_middleware(JWTAuthorisation, config=JWTConfig(
     cert_path=CERT_PATH, algorithms=['RS256']))
@@ -47,87 +58,287 @@ app.add_middleware(
 
 monolith_client = HttpClient()
 
+manageable_members_cache = TTLCache(
+    maxsize=int(os.getenv('MANAGEABLE_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('MANAGEABLE_CACHE_TTL', 30)))
+
+
+STREAM_PARTITION_SIZE = int(os.getenv('STREAM_PARTITION_SIZE', 1000))
+
+CASCADE_CHUNK_SIZE = int(os.getenv('CASCADE_CHUNK_SIZE', 5000))
+
+
+async def get_session():
+    async with async_session() as session:
+        yield session
+
 
 async def check_permissions(http_client: HttpClient, request, requested_member_uuids):
     token: Token = request.state.token
     is_staff = token.isStaff
     user_uuid = token.userUuid
     if is_staff is False:   # Staff can manage all members
-        manageable_uuids = await get_manageable_members(http_client, request, user_uuid)
-        manageable_uuids = list(
-            map(lambda m: UUID(m.get('uuid')), manageable_uuids))
-        if set(requested_member_uuids) - set(manageable_uuids):
+        manageable_uuids = manageable_members_cache.get(user_uuid)
+        if manageable_uuids is None:
+            manageable_uuids = await get_manageable_members(http_client, request, user_uuid)
+            if manageable_uuids is None:
+                manageable_uuids = frozenset()
+            else:
+                manageable_uuids = frozenset(manageable_uuids)
+                manageable_members_cache.set(user_uuid, manageable_uuids)
+        if set(requested_member_uuids) - manageable_uuids:
             raise HTTPException(status_code=HTTP_403_FORBIDDEN,
                                 detail='User is not authorised.')
 
 
+def make_attendance(member_uuid: UUID, course_uuid: UUID, date: date, resolution: str | None) -> Attendance:
+    create = Attendance(member_uuid=member_uuid,
+                        course_uuid=course_uuid,
+                        date=date)
+
+    match (resolution):
+        case 'paid':
+            create.resolution = Resolution(paid=True)
+        case 'comp':
+            create.resolution = Resolution(complementary=True)
+
+    return create
+
+
+async def upsert_attendances(session: AsyncSession, attendances: list[Attendance]) -> list[tuple[Attendance, bool]]:
+    """Inserts the attendances, or updates the resolution of any that already exist for
+    the same member, course and date. Returns each stored attendance with whether
+    it was newly created."""
+    statement = insert(Attendance).values([{
+        'member_uuid': a.member_uuid,
+        'course_uuid': a.course_uuid,
+        'date': a.date,
+        'resolution': a.resolution,
+    } for a in attendances])
+    statement = statement.on_conflict_do_update(
+        constraint='uq_attendance_member_course_date',
+        set_={'resolution_type': statement.excluded.resolution_type})
+
+    # xmax is only zero for a tuple this transaction inserted rather than updated
+    result = await session.execute(statement.returning(Attendance, literal_column('xmax = 0', Boolean)),
+                                   execution_options={'populate_existing': True})
+    return [tuple(row) for row in result.all()]
+
+
+def written(attendance: Attendance, created: bool) -> dict:
+    return {
+        'id': attendance.id,
+        'member_uuid': attendance.member_uuid,
+        'course_uuid': attendance.course_uuid,
+        'date': attendance.date,
+        'resolution': attendance.resolution,
+        'created': created,
+    }
+
+
 @app.on_event("startup")
 async def startup():
     monolith_client.start('http://monolith.southamptonjiujitsu.local:8000' if is_local()
                           else 'https://monolith.southcoastjiujitsu.com')
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await monolith_client.stop()
+    await sa_engine.dispose()
+
+
 @app.post('/attendance/query')
-async def get_attendance(query: AttendanceQuery, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client)) -> list[AttendanceRead]:
+async def get_attendance(query: AttendanceQuery, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client), session: AsyncSession = Depends(get_session)) -> list[AttendanceRead]:
     await check_permissions(http_client, request, query.member_uuids)
 
-    return session.scalars(select(Attendance).where(Attendance.member_uuid.in_(query.member_uuids),
-                                                    Attendance.course_uuid == query.course_uuid,
-                                                    Attendance.date >= query.date_earliest,
-                                                    Attendance.date <= query.date_latest)).all()
+    format = stream_format(request)
+    if format is not None:
+        return StreamingResponse(stream_attendance(query, format), media_type=MEDIA_TYPES[format])
+
+    result = await session.scalars(select(Attendance)
+                                   .where(Attendance.member_uuid.in_(query.member_uuids),
+                                          Attendance.course_uuid == query.course_uuid,
+                                          Attendance.date >= query.date_earliest,
+                                          Attendance.date <= query.date_latest))
+    return result.all()
+
+
+@app.post('/attendance/aggregate')
+async def get_attendance_aggregate(query: AttendanceAggregateQuery, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client), session: AsyncSession = Depends(get_session)) -> list[AttendanceAggregate]:
+    await check_permissions(http_client, request, query.member_uuids)
+
+    groups = {
+        'member': Attendance.member_uuid.label('member_uuid'),
+        'course': Attendance.course_uuid.label('course_uuid'),
+        'week': func.to_char(Attendance.date, 'IYYY-"W"IW').label('week'),
+        'month': func.to_char(Attendance.date, 'YYYY-MM').label('month'),
+    }
+    columns = [groups[g] for g in query.group_by]
+
+    result = await session.execute(select(*columns,
+                                          func.count().filter(Attendance.resolution == Resolution(paid=True)).label('paid'),
+                                          func.count().filter(Attendance.resolution == Resolution(complementary=True)).label('comp'),
+                                          func.count().filter(Attendance.resolution.is_(None)).label('unresolved'),
+                                          func.count().label('total'))
+                                   .where(Attendance.member_uuid.in_(query.member_uuids),
+                                          Attendance.course_uuid == query.course_uuid,
+                                          Attendance.date >= query.date_earliest,
+                                          Attendance.date <= query.date_latest)
+                                   .group_by(*columns)
+                                   .order_by(*columns))
+    return result.mappings().all()
+
+
+async def stream_attendance(query: AttendanceQuery, format: str):
+    """Streams matching attendances as plain rows read through a server-side cursor,
+    so memory use does not grow with the size of the date range. The stream owns
+    its session, as it outlives the request handler."""
+    statement = select(Attendance.member_uuid.label('memberUuid'),
+                       Attendance.course_uuid.label('courseUuid'),
+                       Attendance.date,
+                       case((Attendance.resolution == Resolution(paid=True), 'paid'),
+                            (Attendance.resolution == Resolution(complementary=True), 'comp')).label('resolution'),
+                       Attendance.id)\
+        .where(Attendance.member_uuid.in_(query.member_uuids),
+               Attendance.course_uuid == query.course_uuid,
+               Attendance.date >= query.date_earliest,
+               Attendance.date <= query.date_latest)\
+        .order_by(Attendance.date, Attendance.id)\
+        .execution_options(yield_per=STREAM_PARTITION_SIZE)
+
+    async with async_session() as session:
+        result = await session.stream(statement)
+        partitions = result.mappings().partitions()
+
+        chunks = csv_chunks(partitions, result.keys()) if format == 'csv' \
+            else ndjson_chunks(partitions)
+        async for chunk in chunks:
+            yield chunk
 
 
 @app.post('/attendance/create')
-async def post_attendance(post: AttendancePost, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client)) -> AttendanceRead:
+async def post_attendance(post: AttendancePost, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client), session: AsyncSession = Depends(get_session)) -> AttendanceWrite:
     await check_permissions(http_client, request, [post.member_uuid])
 
-    create = Attendance(member_uuid=post.member_uuid,
-                        course_uuid=post.course_uuid,
-                        date=post.date)
-
-    match (post.resolution):
-        case 'paid':
-            create.resolution = Resolution(paid=True)
-        case 'comp':
-            create.resolution = Resolution(complementary=True)
+    create = make_attendance(
+        post.member_uuid, post.course_uuid, post.date, post.resolution)
 
     try:
         await attempt_attendance(http_client, request, create, post.use_advanced_payment, post.use_subscription)
     except DomainError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
-    session.query(Attendance).filter(Attendance.member_uuid == post.member_uuid,
-                                     Attendance.course_uuid == post.course_uuid,
-                                     Attendance.date == post.date).delete()
-
-    session.add(create)
+    [(attendance, created)] = await upsert_attendances(session, [create])
 
     try:
-        session.commit()
+        await session.commit()
     except:
-        session.rollback()
+        await session.rollback()
         raise
 
-    return create
+    return written(attendance, created)
+
+
+@app.post('/attendance/create/batch')
+async def post_attendance_batch(post: AttendanceBatchPost, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client), session: AsyncSession = Depends(get_session)) -> list[AttendanceBatchResult]:
+    await check_permissions(http_client, request, [
+                            a.member_uuid for a in post.attendances])
+
+    creates = [make_attendance(a.member_uuid, post.course_uuid, post.date, a.resolution)
+               for a in post.attendances]
+
+    errors = await attempt_attendances(http_client, request, post.course_uuid, post.date, [
+        (create, a.use_advanced_payment, a.use_subscription) for create, a in zip(creates, post.attendances)])
+
+    accepted = [create for create in creates
+                if create.member_uuid not in errors]
+
+    stored = {}
+    if accepted:
+        stored = {attendance.member_uuid: written(attendance, created)
+                  for attendance, created in await upsert_attendances(session, accepted)}
+
+        try:
+            await session.commit()
+        except:
+            await session.rollback()
+            raise
+
+    return [{
+        'member_uuid': create.member_uuid,
+        'attendance': stored.get(create.member_uuid),
+        'error': errors.get(create.member_uuid),
+    } for create in creates]
 
 
 @app.post('/attendance/delete')
-async def delete_by_query(query: AttendanceQuery, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client)) -> Response:
+async def delete_by_query(query: AttendanceQuery, request: Request, http_client: aiohttp.ClientSession = Depends(monolith_client), session: AsyncSession = Depends(get_session)) -> Response:
     await check_permissions(http_client, request, query.member_uuids)
 
-    session.query(Attendance).filter(Attendance.member_uuid.in_(query.member_uuids),
-                                     Attendance.course_uuid == query.course_uuid,
-                                     Attendance.date >= query.date_earliest,
-                                     Attendance.date <= query.date_latest).delete()
+    await session.execute(delete(Attendance).where(Attendance.member_uuid.in_(query.member_uuids),
+                                                   Attendance.course_uuid == query.course_uuid,
+                                                   Attendance.date >= query.date_earliest,
+                                                   Attendance.date <= query.date_latest))
 
     try:
-        session.commit()
+        await session.commit()
     except:
-        session.rollback()
+        await session.rollback()
         raise
 
-    for member_uuid in query.member_uuids:
-        await delete_attendance(
-            http_client, request, member_uuid, query.date_earliest, query.course_uuid)
+    errors = await delete_attendances(
+        http_client, request, query.member_uuids, query.date_earliest, query.course_uuid)
+
+    if errors:
+        return JSONResponse(status_code=207, content=[
+            AttendanceDeleteResult(member_uuid=member_uuid, error=errors.get(member_uuid))
+            .model_dump(mode='json', by_alias=True) for member_uuid in query.member_uuids])
+
+    return Response(status_code=204)
+
+
+@app.post('/attendance/cascade')
+async def cascade(post: AttendanceCascade, request: Request, session: AsyncSession = Depends(get_session)) -> Response:
+    """Deletes every attendance of a deleted course or members, a chunk per transaction
+    so that no single statement holds locks across the whole table."""
+    token: Token = request.state.token
+    if token.isStaff is False:
+        raise HTTPException(status_code=HTTP_403_FORBIDDEN,
+                            detail='User is not authorised.')
+
+    criteria = []
+    if post.course_uuid is not None:
+        criteria.append(Attendance.course_uuid == post.course_uuid)
+    if post.member_uuids:
+        criteria.append(Attendance.member_uuid.in_(post.member_uuids))
+
+    chunk = select(Attendance.id).where(or_(*criteria)).limit(CASCADE_CHUNK_SIZE).scalar_subquery()
+    while True:
+        result = await session.execute(delete(Attendance).where(Attendance.id.in_(chunk)))
+
+        try:
+            await session.commit()
+        except:
+            await session.rollback()
+            raise
+
+        if result.rowcount < CASCADE_CHUNK_SIZE:
+            break
+
+    return Response(status_code=204)
+
+
+@app.post('/attendance/permissions/invalidate')
+async def invalidate_permissions(post: PermissionsInvalidate, request: Request) -> Response:
+    token: Token = request.state.token
+    if token.isStaff is False:
+        raise HTTPException(status_code=HTTP_403_FORBIDDEN,
+                            detail='User is not authorised.')
+
+    if post.user_uuid is None:
+        manageable_members_cache.clear()
+    else:
+        manageable_members_cache.invalidate(post.user_uuid)
 
     return Response(status_code=204)
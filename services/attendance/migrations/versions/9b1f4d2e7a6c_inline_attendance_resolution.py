@@ -0,0 +1,60 @@
+"""Inline attendance resolution
+
+Revision ID: 9b1f4d2e7a6c
+Revises: c3e67669afe1
+Create Date: 2026-10-18 11:02:17.448120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f4d2e7a6c'
+down_revision: Union[str, None] = 'c3e67669afe1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sjcattendance_attendance', sa.Column(
+        'resolution_type', sa.SmallInteger(), nullable=True))
+
+    # 1 = paid, 2 = complementary, NULL = unresolved
+    op.execute('UPDATE sjcattendance_attendance a '
+               'SET resolution_type = CASE WHEN r.paid THEN 1 WHEN r.complementary THEN 2 END '
+               'FROM sjcattendance_resolution r WHERE a.resolution = r.id')
+
+    op.create_check_constraint('ck_attendance_resolution_type',
+                               'sjcattendance_attendance', 'resolution_type IN (1, 2)')
+
+    op.drop_column('sjcattendance_attendance', 'resolution')
+    op.drop_table('sjcattendance_resolution')
+
+
+def downgrade() -> None:
+    op.create_table('sjcattendance_resolution',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('paid', sa.Boolean(), nullable=False),
+    sa.Column('complementary', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('sjcattendance_attendance', sa.Column(
+        'resolution', sa.Integer(), nullable=True))
+    op.create_foreign_key(None, 'sjcattendance_attendance', 'sjcattendance_resolution', [
+                          'resolution'], ['id'])
+
+    # Give each resolved attendance its own resolution, reusing the attendance id
+    op.execute('INSERT INTO sjcattendance_resolution (id, paid, complementary) '
+               'SELECT id, resolution_type = 1, resolution_type = 2 '
+               'FROM sjcattendance_attendance WHERE resolution_type IS NOT NULL')
+    op.execute('UPDATE sjcattendance_attendance SET resolution = id '
+               'WHERE resolution_type IS NOT NULL')
+    op.execute("SELECT setval(pg_get_serial_sequence('sjcattendance_resolution', 'id'), "
+               'COALESCE((SELECT MAX(id) FROM sjcattendance_resolution), 0) + 1, false)')
+
+    op.drop_constraint('ck_attendance_resolution_type',
+                       'sjcattendance_attendance', type_='check')
+    op.drop_column('sjcattendance_attendance', 'resolution_type')
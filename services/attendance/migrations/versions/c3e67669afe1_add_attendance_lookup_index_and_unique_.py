@@ -0,0 +1,37 @@
+"""Add attendance lookup index and unique constraint
+
+Revision ID: c3e67669afe1
+Revises: 5604f170e72f
+Create Date: 2026-10-18 09:12:41.203517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e67669afe1'
+down_revision: Union[str, None] = '5604f170e72f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the most recent attendance for any member, course and date
+    op.execute('DELETE FROM sjcattendance_attendance a USING sjcattendance_attendance b '
+               'WHERE a.member_uuid = b.member_uuid AND a.course_uuid = b.course_uuid AND a.date = b.date '
+               'AND a.id < b.id')
+
+    op.create_index('ix_attendance_course_date_member', 'sjcattendance_attendance', [
+                    'course_uuid', 'date', 'member_uuid'])
+    op.create_unique_constraint('uq_attendance_member_course_date', 'sjcattendance_attendance', [
+                                'member_uuid', 'course_uuid', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_attendance_member_course_date',
+                       'sjcattendance_attendance', type_='unique')
+    op.drop_index('ix_attendance_course_date_member',
+                  table_name='sjcattendance_attendance')
@@ -29,16 +29,18 @@ class HttpClient:
         return self.session
 
 
-async def attempt_attendance(client: HttpClient, request, attendance: Attendance, use_advanced_payment: bool, use_subscription: bool):
-    payment_option = 'advance' if use_advanced_payment \
+def _payment_option(use_advanced_payment: bool, use_subscription: bool):
+    return 'advance' if use_advanced_payment \
         else 'subscription' if use_subscription \
         else 'now'
 
+
+async def attempt_attendance(client: HttpClient, request, attendance: Attendance, use_advanced_payment: bool, use_subscription: bool):
     async with client.post(f'/api/members/{str(attendance.member_uuid)}/attendance/log', json={
         'date': attendance.date.isoformat(),
         'course': {'uuid': str(attendance.course_uuid)},
         'payment': attendance.resolution_type,
-        'payment_option': payment_option,
+        'payment_option': _payment_option(use_advanced_payment, use_subscription),
     }, headers={'Authorization': request.headers.get('Authorization')}) as resp:
         default_error = 'Member attendance request was rejected'
         try:
@@ -54,18 +56,85 @@ async def attempt_attendance(client: HttpClient, request, attendance: Attendance
             raise DomainError(default_error)
 
 
-async def delete_attendance(client: HttpClient, request, member_uuid: UUID, date: date, course_uuid: UUID):
-    await client.post(f'/api/members/{str(member_uuid)}/attendance/delete', json={
+async def attempt_attendances(client: HttpClient, request, course_uuid: UUID, date: date, attendances: list[tuple[Attendance, bool, bool]]) -> dict[UUID, str]:
+    """Logs a batch of attendances for one course and date with the monolith in a single
+    request. Returns the rejection reason for each member whose attendance was not accepted."""
+    async with client.post('/api/members/attendance/log', json={
+        'date': date.isoformat(),
+        'course': {'uuid': str(course_uuid)},
+        'attendances': [{
+            'member': {'uuid': str(attendance.member_uuid)},
+            'payment': attendance.resolution_type,
+            'payment_option': _payment_option(use_advanced_payment, use_subscription),
+        } for attendance, use_advanced_payment, use_subscription in attendances],
+    }, headers={'Authorization': request.headers.get('Authorization')}) as resp:
+        default_error = 'Member attendance request was rejected'
+        try:
+            response = await resp.json()
+
+            if resp.status != 200 or 'error' in response:
+                error = response.get('error', default_error)
+                raise DomainError(error)
+
+            errors = {UUID(r.get('member').get('uuid')): r.get('error')
+                      for r in response if r.get('error') is not None}
+        except DomainError as e:
+            errors = {a.member_uuid: str(e) for a, _, _ in attendances}
+        except Exception:
+            errors = {a.member_uuid: default_error for a, _, _ in attendances}
+
+    return errors
+
+
+async def _delete_attendance_chunk(client: HttpClient, request, member_uuids: list[UUID], date: date, course_uuid: UUID) -> dict[UUID, str]:
+    async with client.post('/api/members/attendance/delete', json={
         'date': date.isoformat(),
         'course': {'uuid': str(course_uuid)},
-    }, headers={'Authorization': request.headers.get('Authorization')})
+        'members': [{'uuid': str(m)} for m in member_uuids],
+    }, headers={'Authorization': request.headers.get('Authorization')}) as resp:
+        default_error = 'Member attendance deletion was rejected'
+        try:
+            response = await resp.json()
+
+            if resp.status != 200 or 'error' in response:
+                error = response.get('error', default_error)
+                raise DomainError(error)
+
+            return {UUID(r.get('member').get('uuid')): r.get('error')
+                    for r in response if r.get('error') is not None}
+        except DomainError as e:
+            return {m: str(e) for m in member_uuids}
+        except Exception:
+            return {m: default_error for m in member_uuids}
 
 
-async def get_manageable_members(client: HttpClient, request, user_uuid: UUID):
-    async with client.post('/api/members/query', json={
+async def delete_attendances(client: HttpClient, request, member_uuids: list[UUID], date: date, course_uuid: UUID,
+                             chunk_size: int = 200, concurrency: int = 4) -> dict[UUID, str]:
+    """Deletes the attendances of many members for one date with the monolith. Large batches
+    are split into chunks sent at most `concurrency` at a time. Returns the reason for each
+    member whose attendance could not be deleted."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def delete_chunk(chunk: list[UUID]):
+        async with semaphore:
+            return await _delete_attendance_chunk(client, request, chunk, date, course_uuid)
+
+    results = await asyncio.gather(*[delete_chunk(member_uuids[i:i + chunk_size])
+                                     for i in range(0, len(member_uuids), chunk_size)])
+
+    return {member_uuid: error for errors in results for member_uuid, error in errors.items()}
+
+
+async def get_manageable_members(client: HttpClient, request, user_uuid: UUID) -> list[UUID] | None:
+    """Returns the UUIDs of the members the user may manage, or None if the monolith
+    could not answer."""
+    async with client.post('/api/members/manageable', json={
         'user': str(user_uuid),
     }, headers={'Authorization': request.headers.get('Authorization')}) as resp:
-        response = await resp.json()
-        if resp.status != 200 or 'error' in response:
-            return []
-        return response
+        try:
+            response = await resp.json()
+            if resp.status != 200 or 'error' in response:
+                return None
+            return [UUID(m) for m in response]
+        except Exception:
+            return None
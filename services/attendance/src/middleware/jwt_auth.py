@@ -4,12 +4,14 @@ from fastapi import Request
 from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer
+from hashlib import sha256
 from jose import jwt
 from jose.exceptions import JWTError
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.status import HTTP_401_UNAUTHORIZED
+from starlette.types import ASGIApp, Receive, Scope, Send
 from time import time
 
+from ..cache import TTLCache
 from ..schemas.token import Token
 
 
@@ -20,32 +22,63 @@ def _load_public_key(cert_path: str):
 
 
 class JWTConfig:
-    def __init__(self, cert_path: str, algorithms: list[str]):
+    def __init__(self, cert_path: str, algorithms: list[str], cache_size: int = 1024, cache_ttl: float = 300):
         self.public_key = _load_public_key(cert_path)
         self.algorithms = algorithms
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
 
 
 def _decrypt_jwt(config: JWTConfig, token: str):
     return jwt.decode(token, config.public_key, algorithms=config.algorithms)
 
 
-class JWTAuthorisation(BaseHTTPMiddleware):
-    def __init__(self, app, config: JWTConfig):
+class JWTAuthorisation:
+    """Verifies the bearer token of every HTTP request and exposes its claims as
+    request.state.token. Verified tokens are cached by digest until they expire,
+    so repeat requests with the same token skip signature verification."""
+
+    def __init__(self, app: ASGIApp, config: JWTConfig):
+        self.app = app
         self.config = config
         self.bearer = HTTPBearer(auto_error=True)
-        super().__init__(app)
+        self.verified = TTLCache(maxsize=config.cache_size, ttl=config.cache_ttl)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, next: callable):
+        request = Request(scope)
         try:
-            credentials = await self.bearer(request)
-            decrypted = _decrypt_jwt(self.config, credentials.credentials)
+            token = await self._verify(request)
         except HTTPException as e:
-            return JSONResponse(status_code=e.status_code, content={'detail': e.detail})
-        except JWTError:
-            return JSONResponse(status_code=HTTP_401_UNAUTHORIZED, content={'detail': 'Failed to decrypt JWT ' + credentials.credentials})
+            response = JSONResponse(status_code=e.status_code, content={'detail': e.detail})
+            await response(scope, receive, send)
+            return
+
+        request.state.token = token
+        await self.app(scope, receive, send)
+
+    async def _verify(self, request: Request) -> Token:
+        credentials = await self.bearer(request)
+        digest = sha256(credentials.credentials.encode()).digest()
+
+        token: Token = self.verified.get(digest)
+        if token is None:
+            try:
+                decrypted = _decrypt_jwt(self.config, credentials.credentials)
+            except JWTError:
+                raise HTTPException(status_code=HTTP_401_UNAUTHORIZED,
+                                    detail='Failed to decrypt JWT ' + credentials.credentials)
+
+            token = Token(**decrypted)
+            self.verified.set(digest, token, ttl=min(
+                self.config.cache_ttl, token.expires - time()))
 
-        if 'expires' in decrypted and decrypted['expires'] <= time():
-            return JSONResponse(status_code=HTTP_401_UNAUTHORIZED, content={'detail': 'JWT expired'})
+        if token.expires <= time():
+            self.verified.invalidate(digest)
+            raise HTTPException(status_code=HTTP_401_UNAUTHORIZED,
+                                detail='JWT expired')
 
-        request.state.token = Token(**decrypted)
-        return await next(request)
+        return token
@@ -1,6 +1,6 @@
 from datetime import date
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import CheckConstraint, Index, SmallInteger, TypeDecorator, UniqueConstraint
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from typing import Optional
 from uuid import UUID
 
@@ -11,15 +11,14 @@ class Base(DeclarativeBase):
     pass
 
 
-class Resolution(Base):
-    __tablename__ = 'sjcattendance_resolution'
+class Resolution:
+    """How an attendance was settled. Stored inline on the attendance as a
+    small integer code, so reading it never needs another query."""
 
-    id: Mapped[int] = mapped_column(primary_key=True)
-    paid: Mapped[bool] = mapped_column(default=False)
-    complementary: Mapped[bool] = mapped_column(default=False)
+    PAID = 1
+    COMPLEMENTARY = 2
 
-    attendance: Mapped['Attendance'] = relationship(
-        back_populates='resolution')
+    __slots__ = ('paid', 'complementary')
 
     def __init__(self, paid: bool = False, complementary: bool = False):
         if paid and complementary:
@@ -29,6 +28,18 @@ class Resolution(Base):
         self.paid = paid
         self.complementary = complementary
 
+    @classmethod
+    def from_code(cls, code: int):
+        return cls(paid=code == cls.PAID, complementary=code == cls.COMPLEMENTARY)
+
+    @property
+    def code(self):
+        match True:
+            case self.paid:
+                return self.PAID
+            case self.complementary:
+                return self.COMPLEMENTARY
+
     @property
     def type(self):
         match True:
@@ -37,19 +48,44 @@ class Resolution(Base):
             case self.complementary:
                 return 'comp'
 
+    def __eq__(self, other):
+        return isinstance(other, Resolution) and self.code == other.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return f'Resolution({self.type})'
+
+
+class ResolutionType(TypeDecorator):
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Resolution | None, dialect):
+        return value.code if value is not None else None
+
+    def process_result_value(self, value: int | None, dialect):
+        return Resolution.from_code(value) if value is not None else None
+
 
 class Attendance(Base):
     __tablename__ = 'sjcattendance_attendance'
+    __table_args__ = (
+        Index('ix_attendance_course_date_member',
+              'course_uuid', 'date', 'member_uuid'),
+        UniqueConstraint('member_uuid', 'course_uuid', 'date',
+                         name='uq_attendance_member_course_date'),
+        CheckConstraint('resolution_type IN (1, 2)',
+                        name='ck_attendance_resolution_type'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     date: Mapped[date]
     course_uuid: Mapped[UUID]
     member_uuid: Mapped[UUID]
-    resolution_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey('sjcattendance_resolution.id'), name='resolution')
-
-    resolution: Mapped[Optional['Resolution']] = relationship(
-        back_populates='attendance')
+    resolution: Mapped[Optional[Resolution]] = mapped_column(
+        'resolution_type', ResolutionType)
 
     @property
     def resolution_type(self):
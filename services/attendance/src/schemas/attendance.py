@@ -1,5 +1,5 @@
 from datetime import date
-from pydantic import BaseModel, ConfigDict, BeforeValidator
+from pydantic import BaseModel, ConfigDict, BeforeValidator, field_validator, model_validator
 from pydantic.alias_generators import to_camel
 
 from typing import Annotated, Literal, Optional
@@ -17,6 +17,28 @@ class AttendanceQuery(CamelModel):
     date_latest: date
 
 
+class AttendanceAggregateQuery(AttendanceQuery):
+    group_by: list[Literal['member', 'course', 'week', 'month']] = ['member']
+
+    @field_validator('group_by')
+    @classmethod
+    def groups_are_unique(cls, group_by: list[str]):
+        if len(set(group_by)) != len(group_by):
+            raise ValueError('Each group may only appear once')
+        return group_by
+
+
+class AttendanceAggregate(CamelModel):
+    member_uuid: Optional[UUID] = None
+    course_uuid: Optional[UUID] = None
+    week: Optional[str] = None
+    month: Optional[str] = None
+    paid: int
+    comp: int
+    unresolved: int
+    total: int
+
+
 class AttendanceBase(CamelModel):
     member_uuid: UUID
     course_uuid: UUID
@@ -33,3 +55,49 @@ class AttendanceRead(AttendanceBase):
     resolution: Annotated[Optional[Literal['paid', 'comp']],
                           BeforeValidator(lambda x: x.type if x else x)] = None
     id: int
+
+
+class AttendanceWrite(AttendanceRead):
+    created: bool
+
+
+class AttendanceBatchItem(CamelModel):
+    member_uuid: UUID
+    resolution: Optional[Literal['paid', 'comp']] = None
+    use_advanced_payment: Optional[bool] = False
+    use_subscription: Optional[bool] = False
+
+
+class AttendanceBatchPost(CamelModel):
+    course_uuid: UUID
+    date: date
+    attendances: list[AttendanceBatchItem]
+
+    @field_validator('attendances')
+    @classmethod
+    def members_are_unique(cls, attendances: list[AttendanceBatchItem]):
+        if len(set(a.member_uuid for a in attendances)) != len(attendances):
+            raise ValueError('Each member may only appear once per batch')
+        return attendances
+
+
+class AttendanceBatchResult(CamelModel):
+    member_uuid: UUID
+    attendance: Optional[AttendanceWrite] = None
+    error: Optional[str] = None
+
+
+class AttendanceDeleteResult(CamelModel):
+    member_uuid: UUID
+    error: Optional[str] = None
+
+
+class AttendanceCascade(CamelModel):
+    course_uuid: Optional[UUID] = None
+    member_uuids: list[UUID] = []
+
+    @model_validator(mode='after')
+    def has_criteria(self):
+        if self.course_uuid is None and not self.member_uuids:
+            raise ValueError('A course or at least one member is required')
+        return self
@@ -0,0 +1,8 @@
+from typing import Optional
+from uuid import UUID
+
+from .attendance import CamelModel
+
+
+class PermissionsInvalidate(CamelModel):
+    user_uuid: Optional[UUID] = None
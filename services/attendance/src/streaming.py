@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+
+from datetime import date
+from fastapi import Request
+from typing import AsyncIterator, Iterable, Mapping, Sequence
+from uuid import UUID
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def stream_format(request: Request) -> str | None:
+    """Returns the streaming format requested by a ?format= flag or the Accept header,
+    or None if the client expects a plain JSON array."""
+    requested = request.query_params.get('format')
+    if requested in MEDIA_TYPES:
+        return requested
+
+    accept = request.headers.get('accept', '')
+    for format, media_type in MEDIA_TYPES.items():
+        if media_type in accept:
+            return format
+
+    return None
+
+
+def _jsonable(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+async def ndjson_chunks(partitions: AsyncIterator[Sequence[Mapping]]) -> AsyncIterator[str]:
+    async for rows in partitions:
+        yield ''.join(json.dumps({k: _jsonable(v) for k, v in row.items()}) + '\n'
+                      for row in rows)
+
+
+async def csv_chunks(partitions: AsyncIterator[Sequence[Mapping]], fields: Iterable[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(fields), lineterminator='\n')
+
+    writer.writeheader()
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
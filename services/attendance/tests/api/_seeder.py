@@ -77,6 +77,14 @@ def seed_user(email: str) -> UUID:
                               ).json().get('success').get('uuid'))
 
 
+def read_member(uuid: UUID):
+    return requests.get(f'http://monolith.southamptonjiujitsu.local:8000/api/members/{uuid}',
+                        headers=headers({
+                            'userUuid': USER_UUID,
+                            'isStaff': True,
+                        })).json()
+
+
 def read_member_payments(uuid: UUID):
     return requests.get(f'http://monolith.southamptonjiujitsu.local:8000/api/members/{uuid}/payments',
                         headers=headers({
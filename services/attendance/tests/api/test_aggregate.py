@@ -0,0 +1,103 @@
+import requests
+
+from src.models.attendance import Attendance, Resolution
+from ._seeder import seed_attendances
+from ._jwt import headers
+
+API_ROOT = 'http://localhost:8000'
+API_URL = f'{API_ROOT}/attendance/aggregate'
+
+JOHN = '17f935dd-c1ef-4672-a666-0fccbbdeffa9'
+JANE = 'a6255bd3-02e9-40b7-a4d6-52cdaab7dbea'
+COURSE = 'd96ca318-f35e-475e-8015-4418cc13b343'
+
+
+def _seed():
+    seed_attendances([
+        Attendance(member_uuid=JOHN, course_uuid=COURSE, date='2023-10-02',
+                   resolution=Resolution(paid=True)),
+        Attendance(member_uuid=JOHN, course_uuid=COURSE, date='2023-10-04',
+                   resolution=Resolution(complementary=True)),
+        Attendance(member_uuid=JOHN, course_uuid=COURSE, date='2023-10-09'),
+        Attendance(member_uuid=JANE, course_uuid=COURSE, date='2023-10-04',
+                   resolution=Resolution(paid=True)),
+        Attendance(member_uuid=JANE, course_uuid=COURSE, date='2023-11-01',
+                   resolution=Resolution(paid=True)),
+        Attendance(member_uuid=JANE, course_uuid='2580ff60-4e9e-4cc7-8296-df82c91a73e5', date='2023-10-04',
+                   resolution=Resolution(paid=True)),
+    ])
+
+
+def _query(**kwargs):
+    return requests.post(API_URL, json={
+        'memberUuids': [JOHN, JANE],
+        'courseUuid': COURSE,
+        'dateEarliest': '2023-01-01',
+        'dateLatest': '2023-12-31',
+        **kwargs,
+    }, headers=headers())
+
+
+def test_aggregate_by_member():
+    # Given there are attendances for two members
+    _seed()
+
+    # When I aggregate attendance by member
+    response = _query()
+
+    # Then the query returns success
+    assert response.status_code == 200
+
+    # And each member's attendance on the course is counted by resolution, ordered by member
+    assert response.json() == [
+        {'memberUuid': JOHN, 'courseUuid': None, 'week': None, 'month': None,
+         'paid': 1, 'comp': 1, 'unresolved': 1, 'total': 3},
+        {'memberUuid': JANE, 'courseUuid': None, 'week': None, 'month': None,
+         'paid': 2, 'comp': 0, 'unresolved': 0, 'total': 2},
+    ]
+
+
+def test_aggregate_by_iso_week():
+    # Given there are attendances across several weeks
+    _seed()
+
+    # When I aggregate attendance by ISO week
+    response = _query(groupBy=['week'])
+
+    # Then attendances are counted per week
+    assert response.status_code == 200
+    assert [(a['week'], a['total']) for a in response.json()] == [
+        ('2023-W40', 3), ('2023-W41', 1), ('2023-W44', 1)]
+
+
+def test_aggregate_by_member_and_month():
+    # Given there are attendances across several months
+    _seed()
+
+    # When I aggregate attendance by member and month
+    response = _query(groupBy=['member', 'month'])
+
+    # Then attendances are counted per member per month
+    assert response.status_code == 200
+    assert {(a['memberUuid'], a['month'], a['paid'], a['total']) for a in response.json()} == {
+        (JOHN, '2023-10', 1, 3), (JANE, '2023-10', 1, 1), (JANE, '2023-11', 1, 1)}
+
+
+def test_aggregate_empty():
+    # Given the database contains no data
+    seed_attendances([])
+
+    # When I aggregate attendance by member
+    response = _query(groupBy=['member', 'course'])
+
+    # Then the response contains an empty array
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_aggregate_duplicate_group():
+    # When I aggregate attendance grouping by the same field twice
+    response = _query(groupBy=['week', 'week'])
+
+    # Then the query is rejected
+    assert response.status_code == 422
@@ -0,0 +1,90 @@
+import requests
+
+from datetime import date, timedelta
+
+from src.models.attendance import Attendance
+from ._seeder import seed_attendances
+from ._jwt import headers
+
+API_ROOT = 'http://localhost:8000'
+API_URL = f'{API_ROOT}/attendance/cascade'
+
+COURSE_UUID = '2580ff60-4e9e-4cc7-8296-df82c91a73e5'
+OTHER_COURSE_UUID = '0d4b4f5a-6c3e-4d39-9f5b-3a3c4a7e2d10'
+MEMBER_UUID = 'a6255bd3-02e9-40b7-a4d6-52cdaab7dbea'
+OTHER_MEMBER_UUID = '6a0c3a8e-1f58-4a0f-a3a4-2f1f1e0c9d2b'
+
+
+def _attendances(member_uuid, course_uuid, weeks=10):
+    return [Attendance(date=date(2023, 1, 2) + timedelta(weeks=w),
+                       course_uuid=course_uuid,
+                       member_uuid=member_uuid) for w in range(weeks)]
+
+
+def _count(member_uuid, course_uuid):
+    response = requests.post(f'{API_ROOT}/attendance/query', json={
+        'memberUuids': [member_uuid],
+        'courseUuid': course_uuid,
+        'dateEarliest': '2023-01-01',
+        'dateLatest': '2023-12-31',
+    }, headers=headers())
+    return len(response.json())
+
+
+def test_cascade_course():
+    # Given two members have attended two courses
+    seed_attendances([a for m in [MEMBER_UUID, OTHER_MEMBER_UUID] for c in [COURSE_UUID, OTHER_COURSE_UUID]
+                      for a in _attendances(m, c)])
+
+    # When I cascade the deletion of one course
+    response = requests.post(API_URL, json={'courseUuid': COURSE_UUID}, headers=headers())
+
+    # Then the post returns 204 No Content
+    assert response.status_code == 204
+
+    # And only the attendances of that course are gone
+    assert _count(MEMBER_UUID, COURSE_UUID) == 0
+    assert _count(OTHER_MEMBER_UUID, COURSE_UUID) == 0
+    assert _count(MEMBER_UUID, OTHER_COURSE_UUID) == 10
+    assert _count(OTHER_MEMBER_UUID, OTHER_COURSE_UUID) == 10
+
+
+def test_cascade_members():
+    # Given two members have attended two courses
+    seed_attendances([a for m in [MEMBER_UUID, OTHER_MEMBER_UUID] for c in [COURSE_UUID, OTHER_COURSE_UUID]
+                      for a in _attendances(m, c)])
+
+    # When I cascade the deletion of one member
+    response = requests.post(API_URL, json={'memberUuids': [MEMBER_UUID]}, headers=headers())
+
+    # Then the post returns 204 No Content
+    assert response.status_code == 204
+
+    # And only the attendances of that member are gone
+    assert _count(MEMBER_UUID, COURSE_UUID) == 0
+    assert _count(MEMBER_UUID, OTHER_COURSE_UUID) == 0
+    assert _count(OTHER_MEMBER_UUID, COURSE_UUID) == 10
+    assert _count(OTHER_MEMBER_UUID, OTHER_COURSE_UUID) == 10
+
+
+def test_cascade_requires_criteria():
+    # When I cascade without a course or members
+    response = requests.post(API_URL, json={}, headers=headers())
+
+    # Then the post is rejected
+    assert response.status_code == 422
+
+
+def test_cascade_requires_staff():
+    # Given there are attendances of a course
+    seed_attendances(_attendances(MEMBER_UUID, COURSE_UUID))
+
+    # When a non-staff user cascades the deletion of the course
+    response = requests.post(API_URL, json={'courseUuid': COURSE_UUID},
+                             headers=headers(admin=False))
+
+    # Then the post is forbidden
+    assert response.status_code == 403
+
+    # And the attendances remain
+    assert _count(MEMBER_UUID, COURSE_UUID) == 10
@@ -370,6 +370,50 @@ def test_comp(setup_course_and_member):
     assert post.items() <= result[0].items()
 
 
+def test_remark_updates_existing_attendance(setup_course_and_member):
+    # Given there are no pre-existing attendances
+    seed_attendances([])
+
+    # And there is a single course and member
+    course_uuid, member_uuid = setup_course_and_member
+
+    # When I post a new attendance with a resolution of "comp"
+    post = {
+        'memberUuid': str(member_uuid),
+        'courseUuid': str(course_uuid),
+        'date': '2023-10-15',
+        'resolution': 'comp',
+    }
+    first = requests.post(API_URL, json=post, headers=headers())
+
+    # And I post the same attendance again with no resolution
+    del post['resolution']
+    second = requests.post(API_URL, json=post, headers=headers())
+
+    # Then the first post created the attendance
+    assert first.status_code == 200
+    assert first.json()['created'] is True
+
+    # And the second post updated that same attendance
+    assert second.status_code == 200
+    assert second.json()['created'] is False
+    assert second.json()['id'] == first.json()['id']
+    assert second.json()['resolution'] is None
+
+    # And When I query for the attendance
+    response = requests.post(f'{API_ROOT}/attendance/query', json={
+        'member_uuids': [str(member_uuid)],
+        'courseUuid': str(course_uuid),
+        'dateEarliest': '2023-10-15',
+        'dateLatest': '2023-10-15',
+    }, headers=headers())
+
+    # Then only the updated attendance exists
+    result = response.json()
+    assert len(result) == 1
+    assert {**post, 'resolution': None}.items() <= result[0].items()
+
+
 def test_create_attendance_ineligible_member(setup_course_and_member):
     # Given there are no pre-existing attendances
     seed_attendances([])
@@ -0,0 +1,149 @@
+import pytest
+import requests
+
+from ._seeder import delete_user, delete_course, delete_member, seed_course, seed_attendances, seed_member, seed_user
+from ._jwt import headers
+
+API_ROOT = 'http://localhost:8000'
+API_URL = f'{API_ROOT}/attendance/create/batch'
+
+
+@pytest.fixture
+def setup_course_and_members():
+    course_uuid = seed_course({
+        'label': 'My course',
+        'days': [0],
+    })
+
+    member_uuids = [seed_member({
+        'name': name,
+        'course': {'uuid': str(course_uuid)},
+        'email': email,
+    }) for name, email in [('John Doe', 'johndoe@example.com'), ('Jane Doe', 'janedoe@example.com')]]
+
+    yield (course_uuid, member_uuids)
+
+    delete_course(course_uuid)
+    for member_uuid in member_uuids:
+        delete_member(member_uuid)
+
+
+@pytest.fixture
+def setup_user():
+    user_uuid = seed_user('johndoe@example.com')
+    yield user_uuid
+    delete_user(user_uuid)
+
+
+def test_batch_create(setup_course_and_members):
+    # Given there are no pre-existing attendances
+    seed_attendances([])
+
+    # And there is a single course with two members
+    course_uuid, member_uuids = setup_course_and_members
+
+    # When I post a batch of attendances for the whole class
+    response = requests.post(API_URL, json={
+        'courseUuid': str(course_uuid),
+        'date': '2023-10-15',
+        'attendances': [
+            {'memberUuid': str(member_uuids[0])},
+            {'memberUuid': str(member_uuids[1]), 'resolution': 'paid'},
+        ],
+    }, headers=headers())
+
+    # Then the post returns success
+    assert response.status_code == 200
+
+    # And contains a successful result for each member
+    result = response.json()
+    assert [r.get('memberUuid') for r in result] == [str(m) for m in member_uuids]
+    assert all(r.get('error') is None for r in result)
+    assert result[1].get('attendance').get('resolution') == 'paid'
+
+    # And When I query for the attendances I just created
+    response = requests.post(f'{API_ROOT}/attendance/query', json={
+        'memberUuids': [str(m) for m in member_uuids],
+        'courseUuid': str(course_uuid),
+        'dateEarliest': '2023-10-15',
+        'dateLatest': '2023-10-15',
+    }, headers=headers())
+
+    # Then both attendances are included in the response
+    assert len(response.json()) == 2
+
+
+def test_batch_create_partial_failure(setup_course_and_members):
+    # Given there are no pre-existing attendances
+    seed_attendances([])
+
+    # And there is a single course with two members, neither of which have advance payments
+    course_uuid, member_uuids = setup_course_and_members
+
+    # When I post a batch where one member attempts to use an advance payment
+    response = requests.post(API_URL, json={
+        'courseUuid': str(course_uuid),
+        'date': '2023-10-15',
+        'attendances': [
+            {'memberUuid': str(member_uuids[0])},
+            {'memberUuid': str(member_uuids[1]), 'resolution': 'paid', 'useAdvancedPayment': True},
+        ],
+    }, headers=headers())
+
+    # Then the post returns success
+    assert response.status_code == 200
+
+    # And the rejected attendance contains an appropriate error
+    result = response.json()
+    assert result[0].get('error') is None
+    assert result[1].get('attendance') is None
+    assert result[1].get('error') == 'Usable payment method was not found on account'
+
+    # And When I query for the attendances in the batch
+    response = requests.post(f'{API_ROOT}/attendance/query', json={
+        'memberUuids': [str(m) for m in member_uuids],
+        'courseUuid': str(course_uuid),
+        'dateEarliest': '2023-10-15',
+        'dateLatest': '2023-10-15',
+    }, headers=headers())
+
+    # Then only the accepted attendance was saved
+    result = response.json()
+    assert len(result) == 1
+    assert result[0].get('memberUuid') == str(member_uuids[0])
+
+
+def test_batch_create_duplicate_member(setup_course_and_members):
+    # Given there is a single course with two members
+    course_uuid, member_uuids = setup_course_and_members
+
+    # When I post a batch that contains the same member twice
+    response = requests.post(API_URL, json={
+        'courseUuid': str(course_uuid),
+        'date': '2023-10-15',
+        'attendances': [
+            {'memberUuid': str(member_uuids[0])},
+            {'memberUuid': str(member_uuids[0]), 'resolution': 'paid'},
+        ],
+    }, headers=headers())
+
+    # Then the post is rejected
+    assert response.status_code == 422
+
+
+def test_member_batch_for_other_members_fails(setup_course_and_members, setup_user):
+    # Given there is a single course with two members
+    course_uuid, member_uuids = setup_course_and_members
+
+    # And the first member has an account
+    user_uuid = setup_user
+
+    # When I, as the first member, try and log attendance for both members
+    response = requests.post(API_URL, json={
+        'courseUuid': str(course_uuid),
+        'date': '2023-10-15',
+        'attendances': [{'memberUuid': str(m)} for m in member_uuids],
+    }, headers=headers({'userUuid': str(user_uuid)}, admin=False))
+
+    # Then the post should return a 403 Forbidden
+    assert response.status_code == 403
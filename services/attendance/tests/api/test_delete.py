@@ -1,13 +1,34 @@
+import pytest
 import requests
 
 from src.models.attendance import Attendance, Resolution
-from ._seeder import seed_attendances
+from ._seeder import delete_course, delete_member, read_member, seed_attendances, seed_course, seed_member
 from ._jwt import headers
 
 API_ROOT = 'http://localhost:8000'
 API_URL = f'{API_ROOT}/attendance/delete'
 
 
+@pytest.fixture
+def setup_course_and_members():
+    course_uuid = seed_course({
+        'label': 'My course',
+        'days': [0],
+    })
+
+    member_uuids = [seed_member({
+        'name': name,
+        'course': {'uuid': str(course_uuid)},
+        'email': email,
+    }) for name, email in [('John Doe', 'johndoe@example.com'), ('Jane Doe', 'janedoe@example.com')]]
+
+    yield (course_uuid, member_uuids)
+
+    delete_course(course_uuid)
+    for member_uuid in member_uuids:
+        delete_member(member_uuid)
+
+
 def test_delete_single():
     # Given there is a single attendance with a paid resolution
     seed_attendances([Attendance(date='2023-10-15',
@@ -118,3 +139,32 @@ def test_delete_some():
     # Then the response contains only the one that was not deleted
     result = response.json()
     assert len(result) is 1
+
+
+def test_delete_clears_monolith_attendance(setup_course_and_members):
+    # Given there are no pre-existing attendances
+    seed_attendances([])
+
+    # And two members have attended a session on trial
+    course_uuid, member_uuids = setup_course_and_members
+    response = requests.post(f'{API_ROOT}/attendance/create/batch', json={
+        'courseUuid': str(course_uuid),
+        'date': '2023-10-15',
+        'attendances': [{'memberUuid': str(m)} for m in member_uuids],
+    }, headers=headers())
+    assert response.status_code == 200
+    assert [read_member(m)['remainingTrialSessions'] for m in member_uuids] == [1, 1]
+
+    # When I post to delete their attendance
+    response = requests.post(API_URL, json={
+        'memberUuids': [str(m) for m in member_uuids],
+        'courseUuid': str(course_uuid),
+        'dateEarliest': '2023-10-15',
+        'dateLatest': '2023-10-15',
+    }, headers=headers())
+
+    # Then the post returns success
+    assert response.status_code == 204
+
+    # And both members have their trial session back
+    assert [read_member(m)['remainingTrialSessions'] for m in member_uuids] == [2, 2]
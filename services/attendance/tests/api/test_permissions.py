@@ -0,0 +1,83 @@
+import pytest
+import requests
+
+from uuid import uuid4
+
+from ._seeder import delete_user, delete_course, delete_member, seed_course, seed_member, seed_user
+from ._jwt import headers
+
+API_ROOT = 'http://localhost:8000'
+API_URL = f'{API_ROOT}/attendance/permissions/invalidate'
+
+
+@pytest.fixture
+def setup_course():
+    course_uuid = seed_course({
+        'label': 'My course',
+        'days': [0],
+    })
+    yield course_uuid
+    delete_course(course_uuid)
+
+
+@pytest.fixture
+def setup_user():
+    user_uuid = seed_user('johndoe@example.com')
+    yield user_uuid
+    delete_user(user_uuid)
+
+
+def _query(user_uuid, course_uuid, member_uuid):
+    return requests.post(f'{API_ROOT}/attendance/query', json={
+        'memberUuids': [str(member_uuid)],
+        'courseUuid': str(course_uuid),
+        'dateEarliest': '2023-01-01',
+        'dateLatest': '2023-12-31',
+    }, headers=headers({'userUuid': str(user_uuid)}, admin=False))
+
+
+def test_invalidate_refreshes_manageable_members(setup_course, setup_user):
+    # Given my manageable members have been looked up before I had any members
+    assert _query(setup_user, setup_course, uuid4()).status_code == 403
+
+    # And a member has since been created for my email address
+    member_uuid = seed_member({
+        'name': 'John Doe',
+        'course': {'uuid': str(setup_course)},
+        'email': 'johndoe@example.com',
+    })
+
+    try:
+        # And the stale lookup is still being used
+        assert _query(setup_user, setup_course, member_uuid).status_code == 403
+
+        # When staff invalidate my cached permissions
+        response = requests.post(API_URL, json={
+            'userUuid': str(setup_user),
+        }, headers=headers())
+
+        # Then the post returns 204 No Content
+        assert response.status_code == 204
+
+        # And I can now query attendance for the new member
+        assert _query(setup_user, setup_course, member_uuid).status_code == 200
+    finally:
+        delete_member(member_uuid)
+
+
+def test_invalidate_all(setup_user):
+    # When staff invalidate all cached permissions
+    response = requests.post(API_URL, json={}, headers=headers())
+
+    # Then the post returns 204 No Content
+    assert response.status_code == 204
+
+
+def test_member_user_cannot_invalidate(setup_user):
+    # When a member user tries to invalidate cached permissions
+    response = requests.post(API_URL, json={
+        'userUuid': str(setup_user),
+    }, headers=headers({'userUuid': str(setup_user)}, admin=False))
+
+    # Then the post returns 403 Forbidden
+    assert response.status_code == 403
@@ -1,5 +1,8 @@
+import json
 import requests
 
+from datetime import date, timedelta
+
 from src.models.attendance import Attendance, Resolution
 from ._seeder import seed_attendances
 from ._jwt import headers
@@ -111,3 +114,80 @@ def test_no_resolution():
         'date': '2023-10-15',
         'resolution': None,
     }.items() <= result[0].items()
+
+
+def test_stream_ndjson():
+    # Given the database contains a year of attendances with mixed resolutions
+    seed_attendances([Attendance(member_uuid='17f935dd-c1ef-4672-a666-0fccbbdeffa9',
+                                 course_uuid='d96ca318-f35e-475e-8015-4418cc13b343',
+                                 date=date(2023, 1, 1) + timedelta(days=d),
+                                 resolution=[None, Resolution(paid=True), Resolution(complementary=True)][d % 3])
+                      for d in range(365)])
+
+    # When I query for all attendances and accept newline-delimited JSON
+    response = requests.post(API_URL, json={
+        'memberUuids': ['17f935dd-c1ef-4672-a666-0fccbbdeffa9'],
+        'courseUuid': 'd96ca318-f35e-475e-8015-4418cc13b343',
+        'date_earliest': '2022-10-10',
+        'date_latest': '2024-10-10',
+    }, headers={**headers(), 'Accept': 'application/x-ndjson'})
+
+    # Then the query returns success as newline-delimited JSON
+    assert response.status_code is 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+
+    # And each line is an attendance in the same shape as the JSON response
+    result = [json.loads(line) for line in response.text.splitlines()]
+    assert len(result) == 365
+    assert result[0] == {
+        'memberUuid': '17f935dd-c1ef-4672-a666-0fccbbdeffa9',
+        'courseUuid': 'd96ca318-f35e-475e-8015-4418cc13b343',
+        'date': '2023-01-01',
+        'resolution': None,
+        'id': result[0]['id'],
+    }
+    assert [r['resolution'] for r in result[:3]] == [None, 'paid', 'comp']
+
+
+def test_stream_csv():
+    # Given the database contains a single paid attendance
+    seed_attendances([Attendance(member_uuid='17f935dd-c1ef-4672-a666-0fccbbdeffa9',
+                                 course_uuid='d96ca318-f35e-475e-8015-4418cc13b343',
+                                 date='2023-10-15',
+                                 resolution=Resolution(paid=True))])
+
+    # When I query for all attendances with the CSV format flag
+    response = requests.post(f'{API_URL}?format=csv', json={
+        'memberUuids': ['17f935dd-c1ef-4672-a666-0fccbbdeffa9'],
+        'courseUuid': 'd96ca318-f35e-475e-8015-4418cc13b343',
+        'date_earliest': '2022-10-10',
+        'date_latest': '2024-10-10',
+    }, headers=headers())
+
+    # Then the query returns success as CSV
+    assert response.status_code is 200
+    assert response.headers['content-type'].startswith('text/csv')
+
+    # And the CSV contains a header and the attendance
+    lines = response.text.splitlines()
+    assert lines[0] == 'memberUuid,courseUuid,date,resolution,id'
+    assert lines[1].startswith(
+        '17f935dd-c1ef-4672-a666-0fccbbdeffa9,d96ca318-f35e-475e-8015-4418cc13b343,2023-10-15,paid,')
+    assert len(lines) == 2
+
+
+def test_stream_csv_empty():
+    # Given the database contains no data
+    seed_attendances([])
+
+    # When I query for all attendances and accept CSV
+    response = requests.post(API_URL, json={
+        'memberUuids': ['17f935dd-c1ef-4672-a666-0fccbbdeffa9'],
+        'courseUuid': 'd96ca318-f35e-475e-8015-4418cc13b343',
+        'date_earliest': '2022-10-10',
+        'date_latest': '2024-10-10',
+    }, headers={**headers(), 'Accept': 'text/csv'})
+
+    # Then the CSV contains only a header
+    assert response.status_code is 200
+    assert response.text.splitlines() == ['memberUuid,courseUuid,date,resolution,id']
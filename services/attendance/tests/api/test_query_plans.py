@@ -0,0 +1,72 @@
+import pytest
+
+from datetime import date, timedelta
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects import postgresql
+from uuid import uuid4
+
+from src.models.attendance import Attendance
+from ._seeder import seed_attendances, session
+
+COURSES = [uuid4() for _ in range(50)]
+MEMBERS = [uuid4() for _ in range(200)]
+DAYS = 365
+
+
+@pytest.fixture(scope='module')
+def seed_history():
+    # Seed a few years' worth of history across many courses and members
+    seed_attendances([])
+    start = date(2021, 1, 1)
+    session.execute(insert(Attendance), [{
+        'member_uuid': MEMBERS[(c * 7 + d) % len(MEMBERS)],
+        'course_uuid': course_uuid,
+        'date': start + timedelta(days=d * 3),
+    } for c, course_uuid in enumerate(COURSES) for d in range(DAYS)])
+    session.commit()
+    session.execute(text('ANALYZE sjcattendance_attendance'))
+
+    yield
+
+    seed_attendances([])
+
+
+def _explain(statement) -> str:
+    compiled = statement.compile(dialect=postgresql.dialect(),
+                                 compile_kwargs={'literal_binds': True})
+    return '\n'.join(session.scalars(text(f'EXPLAIN {compiled}')).all())
+
+
+def test_query_uses_index(seed_history):
+    # When I explain the query run by /attendance/query
+    plan = _explain(select(Attendance).where(Attendance.member_uuid.in_(MEMBERS[:10]),
+                                             Attendance.course_uuid == COURSES[0],
+                                             Attendance.date >= date(2022, 1, 1),
+                                             Attendance.date <= date(2022, 12, 31)))
+
+    # Then the planner uses an index rather than scanning the table
+    assert 'Index' in plan
+    assert 'Seq Scan' not in plan
+
+
+def test_delete_by_query_uses_index(seed_history):
+    # When I explain the delete run by /attendance/delete
+    plan = _explain(delete(Attendance).where(Attendance.member_uuid.in_(MEMBERS[:10]),
+                                             Attendance.course_uuid == COURSES[0],
+                                             Attendance.date >= date(2022, 1, 1),
+                                             Attendance.date <= date(2022, 12, 31)))
+
+    # Then the planner uses an index rather than scanning the table
+    assert 'Index' in plan
+    assert 'Seq Scan' not in plan
+
+
+def test_single_attendance_lookup_uses_index(seed_history):
+    # When I explain the lookup of a single member's attendance for one session
+    plan = _explain(delete(Attendance).where(Attendance.member_uuid == MEMBERS[0],
+                                             Attendance.course_uuid == COURSES[0],
+                                             Attendance.date == date(2022, 1, 1)))
+
+    # Then the planner uses an index rather than scanning the table
+    assert 'Index' in plan
+    assert 'Seq Scan' not in plan
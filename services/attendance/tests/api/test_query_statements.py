@@ -0,0 +1,58 @@
+import pytest
+
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from main import app, sa_engine
+from src.models.attendance import Attendance, Resolution
+from ._seeder import seed_attendances
+from ._jwt import headers
+
+MEMBER_UUID = '17f935dd-c1ef-4672-a666-0fccbbdeffa9'
+COURSE_UUID = 'd96ca318-f35e-475e-8015-4418cc13b343'
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with TestClient(app) as client:
+        event.listen(sa_engine.sync_engine,
+                     'before_cursor_execute', before_cursor_execute)
+        yield client, executed
+        event.remove(sa_engine.sync_engine,
+                     'before_cursor_execute', before_cursor_execute)
+
+    seed_attendances([])
+
+
+@pytest.mark.parametrize('count', [1, 10, 100])
+def test_query_runs_single_statement(statements, count):
+    client, executed = statements
+
+    # Given the database contains attendances with resolutions
+    seed_attendances([Attendance(member_uuid=MEMBER_UUID,
+                                 course_uuid=COURSE_UUID,
+                                 date=date(2023, 1, 1) + timedelta(days=d),
+                                 resolution=Resolution(paid=True) if d % 2 else Resolution(complementary=True))
+                      for d in range(count)])
+
+    # When I query for all attendances in a given timespan
+    response = client.post('/attendance/query', json={
+        'memberUuids': [MEMBER_UUID],
+        'courseUuid': COURSE_UUID,
+        'date_earliest': '2022-10-10',
+        'date_latest': '2024-10-10',
+    }, headers=headers())
+
+    # Then every attendance is returned with its resolution
+    assert response.status_code == 200
+    assert len(response.json()) == count
+    assert {a['resolution'] for a in response.json()} <= {'paid', 'comp'}
+
+    # And the database was queried exactly once
+    assert len(executed) == 1
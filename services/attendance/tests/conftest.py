@@ -0,0 +1,15 @@
+import pytest
+
+from time import perf_counter
+
+
+@pytest.fixture
+def timed():
+    """Times a callable, as the mean of a number of runs after one to warm up."""
+    def timed(run, rounds: int = 3) -> float:
+        run()
+        start = perf_counter()
+        for _ in range(rounds):
+            run()
+        return (perf_counter() - start) / rounds
+    return timed
@@ -4,6 +4,7 @@ from time import time
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from jose import jwt
+from src.middleware import jwt_auth
 from src.middleware.jwt_auth import JWTAuthorisation, JWTConfig
 
 PRIV_PATH = os.path.join(os.path.dirname(
@@ -67,3 +68,30 @@ def test_incorrect_scheme():
 
     assert response.status_code == 403
     assert response.json()['detail'] == 'Invalid authentication credentials'
+
+
+def test_verified_token_is_cached(monkeypatch):
+    token = _make_token({
+        'userUuid': '0c7a4c58-8b5c-4c3e-9a57-0e2b0e6f2f27',
+        'expires': time() + 86400,
+        'isStaff': False,
+    })
+
+    calls = []
+    decrypt = jwt_auth._decrypt_jwt
+    monkeypatch.setattr(jwt_auth, '_decrypt_jwt',
+                        lambda config, t: calls.append(t) or decrypt(config, t))
+
+    for _ in range(3):
+        response = client.get(
+            '/test', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 200
+
+    assert calls == [token]
+
+
+def test_invalid_signature():
+    response = client.get(
+        '/test', headers={'Authorization': 'Bearer not.a.jwt'})
+
+    assert response.status_code == 401
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import pytest
+from time import time
+
+from fastapi import FastAPI, Request
+from fastapi.exceptions import HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPBearer
+from jose import jwt
+from jose.exceptions import JWTError
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.status import HTTP_401_UNAUTHORIZED
+
+from src.middleware.jwt_auth import JWTAuthorisation, JWTConfig, _decrypt_jwt
+from src.schemas.token import Token
+
+PRIV_PATH = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '../../_certs/test.key')
+CERT_PATH = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), '../../_certs/test.cer')
+
+REQUESTS = 500
+
+
+class LegacyJWTAuthorisation(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware implementation, verifying every request."""
+
+    def __init__(self, app, config: JWTConfig):
+        self.config = config
+        self.bearer = HTTPBearer(auto_error=True)
+        super().__init__(app)
+
+    async def dispatch(self, request: Request, next: callable):
+        try:
+            credentials = await self.bearer(request)
+            decrypted = _decrypt_jwt(self.config, credentials.credentials)
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={'detail': e.detail})
+        except JWTError:
+            return JSONResponse(status_code=HTTP_401_UNAUTHORIZED, content={'detail': 'Failed to decrypt JWT ' + credentials.credentials})
+
+        if 'expires' in decrypted and decrypted['expires'] <= time():
+            return JSONResponse(status_code=HTTP_401_UNAUTHORIZED, content={'detail': 'JWT expired'})
+
+        request.state.token = Token(**decrypted)
+        return await next(request)
+
+
+def _make_app(middleware):
+    app = FastAPI()
+    app.add_middleware(middleware, config=JWTConfig(
+        cert_path=CERT_PATH, algorithms=['RS256']))
+
+    @app.get('/test')
+    def sut(request: Request):
+        return {'userUuid': str(request.state.token.userUuid)}
+
+    return app
+
+
+def _make_token():
+    with open(PRIV_PATH, 'r') as f:
+        return jwt.encode({
+            'userUuid': '952f3093-aec5-44ed-955e-8e84f096127e',
+            'expires': time() + 86400,
+            'isStaff': True,
+        }, f.read(), algorithm='RS256')
+
+
+async def _serve(app, token: str):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/test',
+        'raw_path': b'/test',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'authorization', f'Bearer {token}'.encode())],
+        'client': ('127.0.0.1', 12345),
+        'server': ('testserver', 80),
+    }
+    statuses = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()   # The body is empty, so only a disconnect can follow
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    for _ in range(REQUESTS):
+        await app(dict(scope), receive, send)
+
+    assert statuses == [200] * REQUESTS
+
+
+@pytest.mark.benchmark
+def test_benchmark_asgi_middleware_against_base_http_middleware(timed):
+    # Given I have the same endpoint behind the legacy and the current middleware
+    token = _make_token()
+    legacy = _make_app(LegacyJWTAuthorisation)
+    current = _make_app(JWTAuthorisation)
+
+    # When I send the same authorised requests through each
+    legacy_time = timed(lambda: asyncio.run(_serve(legacy, token)))
+    current_time = timed(lambda: asyncio.run(_serve(current, token)))
+
+    # Then the current middleware serves them faster
+    assert current_time < legacy_time
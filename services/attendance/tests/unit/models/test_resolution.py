@@ -30,3 +30,28 @@ def test_resolution_cannot_be_both_paid_and_complementary():
     with pytest.raises(InvalidResolutionError):
         # When I create a Resolution that is both paid and complementary
         Resolution(paid=True, complementary=True)
+
+
+def test_resolution_round_trips_through_code():
+    # Given I have a paid and a complementary resolution
+    paid = Resolution(paid=True)
+    comp = Resolution(complementary=True)
+
+    # When I restore them from their stored codes
+    result = [Resolution.from_code(paid.code), Resolution.from_code(comp.code)]
+
+    # Then they are equal to the originals
+    assert result == [paid, comp]
+    assert result[0].type == 'paid'
+    assert result[1].type == 'comp'
+
+
+def test_resolutions_with_same_type_are_equal():
+    # Given I have two separate paid resolutions
+    a = Resolution(paid=True)
+    b = Resolution(paid=True)
+
+    # Then they are equal and hash the same
+    assert a == b
+    assert hash(a) == hash(b)
+    assert a != Resolution(complementary=True)
@@ -0,0 +1,92 @@
+from src.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_returns_stored_value():
+    # Given I have a cache with a value stored
+    sut = TTLCache(maxsize=10, ttl=60, clock=FakeClock())
+    sut.set('key', 'value')
+
+    # When I request the value
+    result = sut.get('key')
+
+    # Then the stored value is returned
+    assert result == 'value'
+
+
+def test_cache_expires_value_after_ttl():
+    # Given I have a cache with a value stored
+    clock = FakeClock()
+    sut = TTLCache(maxsize=10, ttl=60, clock=clock)
+    sut.set('key', 'value')
+
+    # When the time-to-live has passed
+    clock.now = 60
+
+    # Then the value is no longer returned
+    assert sut.get('key') is None
+    assert 'key' not in sut
+
+
+def test_cache_accepts_per_entry_ttl():
+    # Given I have a cache with a value stored with a shorter time-to-live
+    clock = FakeClock()
+    sut = TTLCache(maxsize=10, ttl=60, clock=clock)
+    sut.set('key', 'value', ttl=5)
+
+    # When the shorter time-to-live has passed
+    clock.now = 5
+
+    # Then the value is no longer returned
+    assert sut.get('key') is None
+
+
+def test_cache_evicts_least_recently_used_value():
+    # Given I have a full cache
+    sut = TTLCache(maxsize=2, ttl=60, clock=FakeClock())
+    sut.set('a', 1)
+    sut.set('b', 2)
+
+    # When I read the oldest value and store a new one
+    sut.get('a')
+    sut.set('c', 3)
+
+    # Then the least recently used value is evicted
+    assert sut.get('a') == 1
+    assert sut.get('b') is None
+    assert sut.get('c') == 3
+    assert len(sut) == 2
+
+
+def test_cache_invalidates_value():
+    # Given I have a cache with values stored
+    sut = TTLCache(maxsize=10, ttl=60, clock=FakeClock())
+    sut.set('a', 1)
+    sut.set('b', 2)
+
+    # When I invalidate one of the values
+    sut.invalidate('a')
+
+    # Then only that value is removed
+    assert sut.get('a') is None
+    assert sut.get('b') == 2
+
+
+def test_cache_clears_all_values():
+    # Given I have a cache with values stored
+    sut = TTLCache(maxsize=10, ttl=60, clock=FakeClock())
+    sut.set('a', 1)
+    sut.set('b', 2)
+
+    # When I clear the cache
+    sut.clear()
+
+    # Then no values remain
+    assert len(sut) == 0
@@ -0,0 +1,83 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from datetime import date
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.members import HttpClient, delete_attendances
+
+REQUEST = SimpleNamespace(headers={'Authorization': 'Bearer token'})
+
+
+async def _delete_with_monolith(member_uuids, rejected, **kwargs):
+    calls = []
+    in_flight = [0, 0]  # current, peak
+
+    async def delete(request: web.Request):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        body = await request.json()
+        calls.append([m['uuid'] for m in body['members']])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return web.json_response([{
+            'member': m,
+            'error': 'Member is not authorised' if m['uuid'] in rejected else None,
+        } for m in body['members']])
+
+    app = web.Application()
+    app.router.add_post('/api/members/attendance/delete', delete)
+
+    async with TestServer(app) as server:
+        client = HttpClient()
+        client.start(str(server.make_url('')))
+        try:
+            errors = await delete_attendances(client(), REQUEST, member_uuids, date(2023, 10, 15), uuid4(), **kwargs)
+        finally:
+            await client.stop()
+
+    return errors, calls, in_flight[1]
+
+
+def test_delete_attendances_single_request():
+    # Given I have a small batch of members
+    member_uuids = [uuid4() for _ in range(5)]
+
+    # When I delete their attendance
+    errors, calls, _ = asyncio.run(_delete_with_monolith(member_uuids, rejected=set()))
+
+    # Then the monolith is called once with every member
+    assert calls == [[str(m) for m in member_uuids]]
+
+    # And there are no errors
+    assert errors == {}
+
+
+def test_delete_attendances_chunks_with_bounded_concurrency():
+    # Given I have a large batch of members
+    member_uuids = [uuid4() for _ in range(25)]
+
+    # When I delete their attendance in chunks of 3, at most 2 at a time
+    errors, calls, peak = asyncio.run(_delete_with_monolith(
+        member_uuids, rejected=set(), chunk_size=3, concurrency=2))
+
+    # Then every member is sent exactly once
+    assert len(calls) == 9
+    assert sorted(m for c in calls for m in c) == sorted(str(m) for m in member_uuids)
+
+    # And no more than 2 requests were in flight at once
+    assert peak == 2
+
+
+def test_delete_attendances_reports_member_errors():
+    # Given I have a batch in which one member will be rejected
+    member_uuids = [uuid4() for _ in range(6)]
+
+    # When I delete their attendance in chunks
+    errors, _, _ = asyncio.run(_delete_with_monolith(
+        member_uuids, rejected={str(member_uuids[4])}, chunk_size=2))
+
+    # Then only the rejected member is reported
+    assert errors == {member_uuids[4]: 'Member is not authorised'}
@@ -64,6 +64,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_hosts',
     'sjcadmin.sjcadmin',
     'sjcadmin.sjcmembers',
@@ -78,6 +79,7 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'sjcadmin.sjcadmin.routers.PrimaryStickinessMiddleware',
     'django_hosts.middleware.HostsResponseMiddleware',
 ]
 
@@ -145,6 +147,38 @@ DATABASES = {
         'PASSWORD': os.environ.get('PGPASS'),
         'PORT': 5432,
     },
+    # Read-only views read from here; falls back to the primary when no replica is configured
+    'replica': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'HOST': os.environ.get('PGHOST_REPLICA', os.environ.get('PGHOST')),
+        'NAME': 'southamptonjiujitsu',
+        'USER': 'sjcadmin',
+        'PASSWORD': os.environ.get('PGPASS'),
+        'PORT': 5432,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['sjcadmin.sjcadmin.routers.ReplicaRouter']
+
+# How long a user keeps reading from the primary after they write
+REPLICA_STICKINESS_SECONDS = int(os.environ.get('REPLICA_STICKINESS_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# Local memory by default; set DJANGO_CACHE_DIR to share the cache between the
+# processes on a host through the filesystem
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['DJANGO_CACHE_DIR'],
+    } if os.environ.get('DJANGO_CACHE_DIR') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
 }
 
 DBBACKUP_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
@@ -7,6 +7,7 @@ from functools import wraps
 from time import time
 
 from ...errors import DomainError
+from ...routers import is_pinned_to_primary, replica_reads
 from ....sjcauth.models import User
 
 from jose import jwt
@@ -99,3 +100,17 @@ def handle_error(function=None):
             return JsonResponse({'error': str(e)})
 
     return inner
+
+
+def read_from_replica(view_func):
+    """Serves a read-only view from the replica, unless the user has written recently."""
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        request.read_only = True
+        if is_pinned_to_primary(request):
+            return view_func(request, *args, **kwargs)
+
+        with replica_reads():
+            return view_func(request, *args, **kwargs)
+
+    return _wrapped_view
@@ -1,17 +1,30 @@
 import json
 
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.views.decorators.http import require_http_methods
-from datetime import date
+from datetime import date, timedelta
 from rest_framework import serializers
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from ._middleware import handle_error, login_required_401, role_required
+from ._middleware import handle_error, login_required_401, read_from_replica, role_required
 from ..baseserializer import BaseSerialiser
 from ...models.attendance import Attendance
 from ...models.course import Course
-from ...models.session import Session
+from ...models.roster import MemberRoster
+from ...models.session import CourseCalendar, Session
+from ...models.tenant import Tenant
+from ...renderers import render_json
+from ...schemas import SessionSerializer
+from ...services.attendance import publish_cascade
+
+COURSES_CACHE_SECONDS = 60 * 60 * 24
+MAX_RANGE_DAYS = 366
+TIMETABLE_CACHE_SECONDS = 60 * 60 * 24
 
 
 class CourseSerializer(BaseSerialiser):
@@ -26,13 +39,76 @@ class CourseSerializer(BaseSerialiser):
         return next.date if next else None
 
 
+def _course_listing(tenant_uuid, today: date) -> list[dict]:
+    """The tenant's courses with their next sessions. Cached for the day under the course
+    version, so creating or deleting a course invalidates the listing."""
+    key = f'courses:{tenant_uuid}:{Tenant.fetch_course_version(tenant_uuid)}:{today}'
+    listing = cache.get(key)
+    if listing is None:
+        courses = Course.objects.filter(tenant_uuid=tenant_uuid)
+        listing = [dict(CourseSerializer(c, context={'today': today}).data) for c in courses]
+        cache.set(key, listing, COURSES_CACHE_SECONDS)
+
+    return listing
+
+
 @handle_error
 @login_required_401
 @role_required(['staff'])
+@read_from_replica
 @api_view(['GET'])
 def courses(request):
-    courses = Course.objects.filter(tenant_uuid=request.user.tenant_uuid)
-    return Response(list(map(lambda c: CourseSerializer(c, context={'today': date.today()}).data, courses)))
+    return Response(_course_listing(request.user.tenant_uuid, date.today()))
+
+
+class DateRangeSerializer(BaseSerialiser):
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, data):
+        if data['end'] < data['start']:
+            raise serializers.ValidationError('end must not be before start')
+        if data['end'] - data['start'] >= timedelta(days=MAX_RANGE_DAYS):
+            raise serializers.ValidationError(f'The range must not exceed {MAX_RANGE_DAYS} days')
+        return data
+
+
+def _render_timetable(tenant_uuid, start: date, end: date) -> bytes:
+    courses = Course.objects.filter(tenant_uuid=tenant_uuid).order_by('_label', '_uuid')
+    sessions = CourseCalendar(courses).sessions(start, end)
+    return render_json([SessionSerializer.represent(Session.make(d, c)) for d, c in sessions])
+
+
+@handle_error
+@login_required_401
+@role_required(['staff'])
+@read_from_replica
+@api_view(['GET'])
+def timetable(request):
+    query = DateRangeSerializer(data=request.query_params)
+    if not query.is_valid():
+        return Response(query.errors, status=400)
+
+    start, end = query.validated_data['start'], query.validated_data['end']
+    tenant_uuid = request.user.tenant_uuid
+
+    # Cached timetables are keyed by the course version, which changes whenever a
+    # course is saved or deleted, so they never need invalidating
+    version = Tenant.fetch_course_version(tenant_uuid)
+    etag = quote_etag(f'{tenant_uuid}-{version}-{start}-{end}')
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f'timetable:{tenant_uuid}:{version}:{start}:{end}'
+        body = cache.get(key)
+        if body is None:
+            body = _render_timetable(tenant_uuid, start, end)
+            cache.set(key, body, TIMETABLE_CACHE_SECONDS)
+        response = HttpResponse(body, content_type='application/json')
+
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required_401
@@ -47,17 +123,39 @@ def get_course(request, pk):
     return Response(CourseSerializer(c, context={'today': date.today()}).data)
 
 
+@handle_error
+@login_required_401
+@role_required(['staff'])
+@read_from_replica
+@api_view(['GET'])
+def register(request, pk):
+    query = DateRangeSerializer(data=request.query_params)
+    if not query.is_valid():
+        return Response(query.errors, status=400)
+
+    c = Course.fetch_by_uuid(pk, tenant_uuid=request.user.tenant_uuid)
+    register = Attendance.fetch_register(c, query.validated_data['start'], query.validated_data['end'])
+
+    return HttpResponse(render_json(register), content_type='application/json')
+
+
 @handle_error
 @login_required_401
 @role_required(['staff'])
 @api_view(['POST'])
 def delete_course(request, pk):
     c = Course.fetch_by_uuid(pk, tenant_uuid=request.user.tenant_uuid)
+    course_uuid = c.uuid
 
-    if c:
-        Attendance.objects.filter(_course=c).delete()
+    # Attendances are deleted a chunk per transaction, so a long-running course does not
+    # hold its locks for the whole cascade
+    members = MemberRoster.members_of_course(c)
+    attended = Attendance.clear_course(c)
 
-    c.delete()
+    with transaction.atomic():
+        c.delete()
+        MemberRoster.refresh(list(set(members) | attended))
+        publish_cascade(course_uuid=course_uuid)
 
     return Response(None, 204)
 
@@ -1,73 +1,54 @@
+import json
+
 from datetime import date
 from uuid import UUID
 
+from django.db import transaction
+from django.http import HttpResponse
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from ._middleware import handle_error, login_required_401, role_required
+from ._middleware import handle_error, login_required_401, read_from_replica, role_required
 from ..baseserializer import BaseSerialiser
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, page_limit, paginate
 from ...models.attendance import Attendance
+from ...models.roster import MemberRoster
 from ...models.student import Student as Member, Payment, Subscription
 from ...models.course import Course
 from ...models.tenant import Tenant
-from ...schemas import BaseSerialiser
+from ...errors import DomainError, InvalidCursorError
+from ...schemas import BaseSerialiser, CourseSerializer, MemberSerializer, PaymentSerializer, SubscriptionSerializer
+from ...services.attendance import publish_cascade
 from ....sjcauth.models import User
 
-
-class CourseSerializer(BaseSerialiser):
-    uuid = serializers.UUIDField()
-    label = serializers.CharField(required=False, allow_blank=True)
+MAX_SEARCH_RESULTS = 50
 
 
 class MemberQuerySerializer(BaseSerialiser):
     courses = CourseSerializer(many=True, required=False)
     user = serializers.UUIDField(required=False)
     name = serializers.CharField(required=False, allow_blank=True)
+    limit = serializers.IntegerField(required=False, min_value=1)
+    cursor = serializers.CharField(required=False)
 
 
-class LicenceSerializer(BaseSerialiser):
-    number = serializers.IntegerField()
-    expiry_date = serializers.DateField(source='expires')
+class MemberSearchSerializer(BaseSerialiser):
+    q = serializers.CharField()
+    limit = serializers.IntegerField(
+        required=False, default=10, min_value=1, max_value=MAX_SEARCH_RESULTS)
 
 
-class PaymentSerializer(BaseSerialiser):
-    course = CourseSerializer()
-    datetime = serializers.DateTimeField(required=False, source='time')
-    used = serializers.BooleanField(required=False)
-
-
-class SubscriptionSerializer(BaseSerialiser):
-    course = CourseSerializer()
-    type = serializers.CharField()
-    expiry_date = serializers.DateField(required=False, allow_null=True)
-
-
-class MemberSerializer(BaseSerialiser):
-    uuid = serializers.CharField()
-    name = serializers.CharField()
+class MemberSearchResultSerializer(BaseSerialiser):
+    uuid = serializers.UUIDField()
+    name = serializers.CharField(source='profile_name', allow_null=True)
+    email = serializers.CharField(source='profile_email', allow_null=True)
     active = serializers.BooleanField()
-    email = serializers.CharField()
-    phone = serializers.CharField()
-    date_of_birth = serializers.DateField()
-    address = serializers.CharField()
-    join_date = serializers.DateField()
-    remaining_trial_sessions = serializers.IntegerField()
-    added_by = serializers.CharField()
-    club_name = serializers.CharField()
-
-    licence = LicenceSerializer(required=False)
-    courses = CourseSerializer(many=True, read_only=True)
-    unused_payments = PaymentSerializer(
-        many=True, read_only=True, source='get_unused_payments')
 
-    subscriptions = serializers.SerializerMethodField()
 
-    def get_subscriptions(self, obj: Member):
-        today = self.context['today']
-        subscriptions = obj.get_unexpired_subscriptions(today)
-        return list(map(lambda s: SubscriptionSerializer(s).data, subscriptions))
+class ManageableQuerySerializer(BaseSerialiser):
+    user = serializers.UUIDField()
 
 
 class NewMemberSerializer(BaseSerialiser):
@@ -85,9 +66,71 @@ class AttendanceSerializer(BaseSerialiser):
         choices=['now', 'advance', 'subscription'], required=False)
 
 
+class MemberReferenceSerializer(BaseSerialiser):
+    uuid = serializers.UUIDField()
+
+
+class AttendanceBatchItemSerializer(BaseSerialiser):
+    member = MemberReferenceSerializer()
+    payment = serializers.ChoiceField(
+        choices=['complementary', 'comp', 'paid', 'attending'], allow_null=True, required=False)
+    payment_option = serializers.ChoiceField(
+        choices=['now', 'advance', 'subscription'], required=False)
+
+
+class AttendanceBatchSerializer(BaseSerialiser):
+    course = CourseSerializer()
+    date = serializers.DateField()
+    attendances = AttendanceBatchItemSerializer(many=True)
+
+
+class AttendanceBatchResultSerializer(BaseSerialiser):
+    member = MemberReferenceSerializer()
+    attendance = AttendanceSerializer(allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
+class AttendanceBatchDeleteSerializer(BaseSerialiser):
+    course = CourseSerializer()
+    date = serializers.DateField()
+    members = MemberReferenceSerializer(many=True)
+
+
+class AttendanceBatchDeleteResultSerializer(BaseSerialiser):
+    member = MemberReferenceSerializer()
+    error = serializers.CharField(allow_null=True)
+
+
+@transaction.atomic
+def _log_attendance(member: Member, course: Course, date: date, payment: str, payment_option: str) -> Attendance:
+    # Clearing and saving both refresh the member's roster row; refresh it once
+    with MemberRoster.deferred():
+        Attendance.clear(member, date=date)
+
+        attendance = Attendance.register_student(
+            member, date=date, course=course)
+
+        match payment:
+            case 'complementary':
+                attendance.mark_as_complementary()
+            case 'comp':
+                attendance.mark_as_complementary()
+            case 'paid':
+                if payment_option == 'now':
+                    member.take_payment(Payment.make(timezone.now(), course))
+                attendance.pay(use_subscription=(
+                    payment_option == 'subscription'))
+
+        attendance.save()
+        member.save()
+
+        return attendance
+
+
 @handle_error
 @login_required_401
 @role_required(['member', 'staff'])
+@read_from_replica
 @api_view(['GET'])
 def member(request, member_uuid: UUID):
     m = Member.fetch_by_uuid(member_uuid, club_uuid=request.user.tenant_uuid)
@@ -95,12 +138,13 @@ def member(request, member_uuid: UUID):
     if request.user.is_member_user and not m.is_user(request.user):
         return Response({'error': 'Member is not authorised.'}, 403)
 
-    return Response(MemberSerializer(m, context={'today': date.today()}).data)
+    return Response(MemberSerializer.represent(m, {'today': date.today()}))
 
 
 @handle_error
 @login_required_401
 @role_required(['member', 'staff'])
+@read_from_replica
 @api_view(['POST'])
 def query(request):
     query = MemberQuerySerializer(data=request.data)
@@ -116,14 +160,70 @@ def query(request):
         if user is None or (user and user.uuid != request.user.uuid):
             return Response({'error': 'Member is not authorised.'}, 403)
 
-    members = Member.fetch_query(
+    paginated = 'limit' in query or 'cursor' in query
+    try:
+        limit = page_limit(query.get('limit', MAX_PAGE_SIZE)) if paginated else None
+        after = decode_cursor(query.get('cursor')) if 'cursor' in query else None
+    except InvalidCursorError as e:
+        return Response({'error': str(e)}, 400)
+
+    rows = MemberRoster.fetch_query(
+        club_uuid=request.user.tenant_uuid,
         course_uuids=courses,
-        user=user,
+        email=user.email if user else None,
         name=query.get('name', None),
-        club_uuid=request.user.tenant_uuid,
+        after=after,
+        limit=limit + 1 if paginated else None,
     )
 
-    return Response(list(map(lambda m: MemberSerializer(m, context={'today': date.today()}).data, members)))
+    # Roster rows hold each member pre-rendered, so the response is assembled from them as is
+    today = date.today()
+    rows, next = paginate(list(rows), limit, position=lambda r: (r[2], r[3])) if paginated else (rows, None)
+    members = '[' + ','.join(MemberRoster.render(m, s, today) for m, s, _, _ in rows) + ']'
+
+    if not paginated:
+        return HttpResponse(members, content_type='application/json')
+
+    return HttpResponse('{"members":' + members + ',"next":' + json.dumps(next) + '}',
+                        content_type='application/json')
+
+
+@handle_error
+@login_required_401
+@role_required(['staff'])
+@read_from_replica
+@api_view(['GET'])
+def search(request):
+    query = MemberSearchSerializer(data=request.query_params)
+    if not query.is_valid():
+        return Response(query.errors, status=400)
+
+    query = query.validated_data
+
+    members = Member.search(query.get('q'), club_uuid=request.user.tenant_uuid, limit=query.get('limit'))
+
+    return Response(list(map(lambda m: MemberSearchResultSerializer(m).data, members)))
+
+
+@handle_error
+@login_required_401
+@role_required(['member', 'staff'])
+@api_view(['POST'])
+def manageable(request):
+    query = ManageableQuerySerializer(data=request.data)
+    if not query.is_valid():
+        return Response(query.errors, status=400)
+
+    user = User.fetch_by_uuid(query.validated_data.get('user'))
+
+    if request.user.is_member_user:
+        if user is None or user.uuid != request.user.uuid:
+            return Response({'error': 'Member is not authorised.'}, 403)
+
+    if user is None:
+        return Response([])
+
+    return Response([str(u) for u in Member.fetch_uuids_for_user(user, club_uuid=request.user.tenant_uuid)])
 
 
 @handle_error
@@ -153,7 +253,7 @@ def create(request):
         member.sign_up(course)
         member.save()
 
-    return Response(MemberSerializer(member, context={'today': date.today()}).data)
+    return Response(MemberSerializer.represent(member, {'today': date.today()}))
 
 
 @handle_error
@@ -165,9 +265,10 @@ def delete(request, member_uuid):
         member_uuid, club_uuid=request.user.tenant_uuid)
 
     if member:
-        Attendance.objects.filter(student=member).delete()
+        Attendance.clear_students([member])
 
     member.delete()
+    publish_cascade(member_uuids=[member_uuid])
     return Response(None, 204)
 
 
@@ -191,28 +292,56 @@ def log_attendance(request, member_uuid):
     course = Course.objects.get(_uuid=data.get('course').get(
         'uuid'), tenant_uuid=member.club_uuid)
 
-    Attendance.clear(member, date=data.get('date'))
+    attendance = _log_attendance(member, course, data.get(
+        'date'), data.get('payment'), data.get('payment_option'))
 
-    attendance = Attendance.register_student(
-        member, date=data.get('date'), course=course)
+    return Response(AttendanceSerializer(attendance).data)
 
-    payment = data.get('payment')
 
-    match payment:
-        case 'complementary':
-            attendance.mark_as_complementary()
-        case 'comp':
-            attendance.mark_as_complementary()
-        case 'paid':
-            if data.get('payment_option') == 'now':
-                member.take_payment(Payment.make(timezone.now(), course))
-            attendance.pay(use_subscription=(
-                data.get('payment_option') == 'subscription'))
+@handle_error
+@login_required_401
+@role_required(['member', 'staff'])
+@api_view(['POST'])
+def log_attendances(request):
+    data = AttendanceBatchSerializer(data=request.data)
+    if not data.is_valid():
+        return Response(data.errors, status=400)
 
-    attendance.save()
-    member.save()
+    data = data.validated_data
 
-    return Response(AttendanceSerializer(attendance).data)
+    course = Course.objects.get(_uuid=data.get('course').get('uuid'))
+
+    member_uuids = [a.get('member').get('uuid')
+                    for a in data.get('attendances')]
+    members = Member.fetch_by_uuids(member_uuids) if request.user.is_member_user else Member.fetch_by_uuids(
+        member_uuids, club_uuid=request.user.tenant_uuid)
+    members = {m.uuid: m for m in members}
+
+    results = []
+    with MemberRoster.deferred():
+        for item in data.get('attendances'):
+            member_uuid = item.get('member').get('uuid')
+            member = members.get(member_uuid)
+            result = {'member': {'uuid': member_uuid},
+                      'attendance': None, 'error': None}
+
+            if member is None:
+                result['error'] = 'Member not found'
+            elif course.tenant_uuid != member.club_id:
+                result['error'] = 'Course not found'
+            elif request.user.is_member_user and not member.is_user(request.user):
+                result['error'] = 'Member is not authorised'
+            else:
+                try:
+                    with transaction.atomic():
+                        result['attendance'] = _log_attendance(member, course, data.get(
+                            'date'), item.get('payment'), item.get('payment_option'))
+                except DomainError as e:
+                    result['error'] = str(e)
+
+            results.append(result)
+
+    return Response(list(map(lambda r: AttendanceBatchResultSerializer(r).data, results)))
 
 
 @handle_error
@@ -237,6 +366,42 @@ def delete_attendance(request, member_uuid):
     return Response(None, 204)
 
 
+@handle_error
+@login_required_401
+@role_required(['member', 'staff'])
+@api_view(['POST'])
+def delete_attendances(request):
+    data = AttendanceBatchDeleteSerializer(data=request.data)
+    if not data.is_valid():
+        return Response(data.errors, status=400)
+
+    data = data.validated_data
+
+    member_uuids = [m.get('uuid') for m in data.get('members')]
+    members = Member.fetch_by_uuids(member_uuids) if request.user.is_member_user else Member.fetch_by_uuids(
+        member_uuids, club_uuid=request.user.tenant_uuid)
+    members = {m.uuid: m for m in members}
+
+    results = []
+    clearable = []
+    for member_uuid in member_uuids:
+        member = members.get(member_uuid)
+        result = {'member': {'uuid': member_uuid}, 'error': None}
+
+        if member is None:
+            pass    # Nothing to clear
+        elif request.user.is_member_user and not member.is_user(request.user):
+            result['error'] = 'Member is not authorised'
+        else:
+            clearable.append(member)
+
+        results.append(result)
+
+    Attendance.clear_many(clearable, date=data.get('date'))
+
+    return Response(list(map(lambda r: AttendanceBatchDeleteResultSerializer(r).data, results)))
+
+
 @login_required_401
 @role_required(['member', 'staff'])
 @api_view(['POST'])
@@ -261,7 +426,7 @@ def add_payment(request, member_uuid):
     member.take_payment(payment)
     member.save()
 
-    return Response(PaymentSerializer(payment).data)
+    return Response(PaymentSerializer.represent(payment))
 
 
 @login_required_401
@@ -278,7 +443,7 @@ def payments(request, member_uuid):
     last_30_used_payments = member.get_last_payments(30)
     unused_payments = member.get_unused_payments()
 
-    return Response(list(map(lambda p: PaymentSerializer(p).data, last_30_used_payments + unused_payments)))
+    return Response([PaymentSerializer.represent(p) for p in last_30_used_payments + unused_payments])
 
 
 @login_required_401
@@ -305,7 +470,7 @@ def add_subscription(request, member_uuid):
     member.subscribe(subscription)
     member.save()
 
-    return Response(SubscriptionSerializer(subscription).data)
+    return Response(SubscriptionSerializer.represent(subscription))
 
 
 @login_required_401
@@ -319,7 +484,7 @@ def subscriptions(request, member_uuid):
     if request.user.is_member_user and not member.is_user(request.user):
         return Response({'error': 'Member is not authorised'}, 403)
 
-    return Response(list(map(lambda s: SubscriptionSerializer(s).data, member.subscriptions)))
+    return Response([SubscriptionSerializer.represent(s) for s in member.subscriptions])
 
 
 @login_required_401
@@ -342,6 +507,6 @@ def cancel_subscription(request, member_uuid):
     course = Course.objects.get(_uuid=data.get(
         'uuid'), tenant_uuid=member.club_uuid)
 
-    Subscription.objects.filter(student=member, course=course).delete()
+    member.unsubscribe(course)
 
     return Response(None, 204)
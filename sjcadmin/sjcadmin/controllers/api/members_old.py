@@ -5,10 +5,13 @@ from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 from datetime import date
 
-from ._middleware import handle_error, login_required_401, role_required
+from ._middleware import handle_error, login_required_401, read_from_replica, role_required
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, page_limit, paginate
+from ...errors import InvalidCursorError
 from ...models.attendance import Attendance
 from ...models.course import Course
 from ...models.student import Licence, Note, Student, Payment, Profile
+from ...services.attendance import publish_cascade
 from ....sjcauth.models import User
 
 
@@ -18,9 +21,22 @@ def _username(student) -> str:
 
 @login_required_401
 @role_required(['staff'])
+@read_from_replica
 @require_http_methods(['GET'])
 def get_members(request):
-    students = Student.fetch_all(club_uuid=request.user.tenant_uuid)
+    paginated = 'limit' in request.GET or 'cursor' in request.GET
+    try:
+        limit = page_limit(request.GET.get('limit', MAX_PAGE_SIZE)) if paginated else None
+        after = decode_cursor(request.GET['cursor']) if 'cursor' in request.GET else None
+    except InvalidCursorError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    students = Student.fetch_all(club_uuid=request.user.tenant_uuid,
+                                 after=after, limit=limit + 1 if paginated else None)
+    next = None
+    if paginated:
+        students, next = paginate(list(students), limit)
+
     students_data = []
     for s in students:
         student_data = {
@@ -46,6 +62,9 @@ def get_members(request):
                 'exp': s.is_licence_expired()
             }})
         students_data.append(student_data)
+
+    if paginated:
+        return JsonResponse({'members': students_data, 'next': next})
     return JsonResponse(students_data, safe=False)
 
 
@@ -126,8 +145,9 @@ def post_update_member_profile(request, pk):
 def post_delete_member(request, pk):
     s = Student.fetch_by_uuid(pk, club_uuid=request.user.tenant_uuid)
     if s:
-        Attendance.objects.filter(student=s).delete()
+        Attendance.clear_students([s])
     s.delete()
+    publish_cascade(member_uuids=[pk])
 
     return JsonResponse({'success': {'uuid': s.uuid}})
 
@@ -193,7 +213,7 @@ def post_add_member_to_course(request, pk):
     s = Student.fetch_by_uuid(pk, club_uuid=request.user.tenant_uuid)
     course = Course.fetch_by_uuid(
         data.get('uuid'), tenant_uuid=request.user.tenant_uuid)
-    s._courses.add(course)
+    s.sign_up(course)
     s.save()
 
     return JsonResponse({'success': None})
@@ -208,7 +228,7 @@ def post_remove_member_from_course(request, pk):
     s = Student.fetch_by_uuid(pk, club_uuid=request.user.tenant_uuid)
     course = Course.fetch_by_uuid(
         data.get('uuid'), tenant_uuid=request.user.tenant_uuid)
-    s._courses.remove(course)
+    s.unsign_up(course)
     s.save()
 
     return JsonResponse({'success': None})
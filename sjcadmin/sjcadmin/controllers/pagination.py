@@ -0,0 +1,47 @@
+import base64
+import json
+
+from uuid import UUID
+
+from ..errors import InvalidCursorError
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(sort_name: str, uuid: UUID) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort_name, str(uuid)]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, UUID]:
+    try:
+        sort_name, uuid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(sort_name), UUID(uuid)
+    except Exception:
+        raise InvalidCursorError('Invalid cursor')
+
+
+def page_limit(limit) -> int:
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise InvalidCursorError('Invalid page size')
+
+    if limit < 1:
+        raise InvalidCursorError('Invalid page size')
+
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _member_position(member) -> tuple[str, UUID]:
+    return member._sort_name, member.uuid
+
+
+def paginate(members: list, limit: int, position=_member_position) -> tuple[list, str | None]:
+    """Splits members fetched with a limit of limit + 1 into the page to return and
+    the cursor for the next page, if there is one. `position` gives a member's sort
+    name and UUID."""
+    if len(members) <= limit:
+        return members, None
+
+    members = members[:limit]
+    return members, encode_cursor(*position(members[-1]))
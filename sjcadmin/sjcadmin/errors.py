@@ -16,3 +16,7 @@ class NoRemainingTrialSessionsError(DomainError):
 
 class NoPaymentFound(DomainError):
     pass
+
+
+class InvalidCursorError(DomainError):
+    pass
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from ...models import Attendance, MemberRoster, Student
+
+
+class Command(BaseCommand):
+    help = 'Recomputes each member\'s attended sessions counter from their attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Report members whose counter has drifted without correcting it')
+
+    def handle(self, *args, **options):
+        attended = Coalesce(Subquery(
+            Attendance.objects.filter(student=OuterRef('pk')).order_by()
+            .values('student').annotate(n=Count('id')).values('n')), Value(0))
+
+        if options['verify']:
+            drifted = Student.objects.annotate(_counted=attended)\
+                .exclude(_sessions_attended=F('_counted'))\
+                .values_list('uuid', '_sessions_attended', '_counted')
+
+            for uuid, stored, counted in drifted:
+                self.stdout.write(f'{uuid}: stored {stored}, counted {counted}')
+
+            if drifted:
+                raise CommandError(f'{len(drifted)} counter(s) out of date')
+
+            self.stdout.write('All counters are up to date')
+            return
+
+        updated = Student.objects.update(_sessions_attended=attended)
+        MemberRoster.rebuild()
+        self.stdout.write(f'Rebuilt counters for {updated} member(s)')
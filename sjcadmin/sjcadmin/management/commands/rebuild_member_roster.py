@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from ...models import MemberRoster
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the precomputed member roster rows from members\' current state'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true',
+                            help='Only build rows for members that do not have one')
+
+    def handle(self, *args, **options):
+        rebuilt = MemberRoster.rebuild(missing_only=options['missing'])
+        self.stdout.write(f'Rebuilt roster rows for {rebuilt} member(s)')
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:30
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sjcadmin', '0019_student_club_alter_student_tenant_uuid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(models.F('club'), django.db.models.functions.comparison.Coalesce('profile_name', models.Value('')), models.F('uuid'), name='student_club_name_uuid_idx'),
+        ),
+    ]
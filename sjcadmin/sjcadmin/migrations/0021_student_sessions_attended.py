@@ -0,0 +1,27 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sjcadmin', '0020_student_club_name_uuid_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='_sessions_attended',
+            field=models.IntegerField(db_column='sessions_attended', default=0),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE sjcadmin_student s
+                SET sessions_attended = (
+                    SELECT COUNT(*) FROM sjcadmin_attendance a WHERE a.student_id = s.uuid
+                )
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:38
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sjcadmin', '0021_student_sessions_attended'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='student',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['profile_name'], name='student_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['profile_email'], name='student_email_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
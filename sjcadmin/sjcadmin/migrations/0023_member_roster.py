@@ -0,0 +1,32 @@
+# Generated by Django 4.1.3 on 2026-10-18 19:45
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sjcadmin', '0022_student_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberRoster',
+            fields=[
+                ('student', models.OneToOneField(db_column='student_uuid', on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='sjcadmin.student')),
+                ('name', models.CharField(max_length=120, null=True)),
+                ('sort_name', models.CharField(max_length=120)),
+                ('email', models.EmailField(max_length=254, null=True)),
+                ('course_uuids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), default=list, size=None)),
+                ('member', models.TextField()),
+                ('subscriptions', models.TextField()),
+                ('club', models.ForeignKey(db_column='club_uuid', on_delete=django.db.models.deletion.CASCADE, to='sjcadmin.tenant')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='memberroster',
+            index=models.Index(fields=['club', 'sort_name', 'student'], name='roster_club_name_member_idx'),
+        ),
+    ]
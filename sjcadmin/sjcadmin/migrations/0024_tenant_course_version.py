@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sjcadmin', '0023_member_roster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenant',
+            name='course_version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 21:06
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sjcadmin', '0024_tenant_course_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='memberroster',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='roster_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
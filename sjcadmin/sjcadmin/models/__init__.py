@@ -1,5 +1,7 @@
+from . import lookups
 from .attendance import Attendance
 from .course import Course
+from .roster import MemberRoster
 from .student import Student
-from .session import Session
+from .session import CourseCalendar, Session
 from .tenant import Tenant
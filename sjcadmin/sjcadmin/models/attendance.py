@@ -1,10 +1,15 @@
 import datetime
-from django.db import models
+from django.db import connection, models, transaction
 
 from ..errors import *
 from .course import Course
+from .roster import MemberRoster
+from .session import Session
 from .student import Student
 
+# The most attendances a cascade deletes in one statement
+CASCADE_CHUNK_SIZE = 5000
+
 
 class Attendance(models.Model):
     student = models.ForeignKey(Student, on_delete=models.RESTRICT)
@@ -14,6 +19,11 @@ class Attendance(models.Model):
     _course = models.ForeignKey(
         'Course', null=True, on_delete=models.SET_NULL, db_column='course_uuid')
 
+    # Resolution codes of registers; paid and complementary match the attendance service's
+    ATTENDING = 0
+    PAID = 1
+    COMPLEMENTARY = 2
+
     @classmethod
     def fetch_for_course(
         cls,
@@ -23,6 +33,30 @@ class Attendance(models.Model):
     ):
         return cls.objects.filter(date__gte=earliest, date__lte=latest, _course=course)
 
+    @classmethod
+    def fetch_register(cls, course: Course, earliest: datetime.date, latest: datetime.date) -> dict:
+        """The course's register between the dates: the members who attended ordered by name,
+        the session dates, including any other day an attendance was logged on, and a row of
+        resolution codes per member with None where they did not attend."""
+        attendances = list(cls.fetch_for_course(course, earliest, latest).select_related('student'))
+
+        members = sorted({a.student.uuid: a.student for a in attendances}.values(),
+                         key=lambda m: (m.name or '', str(m.uuid)))
+        dates = sorted({s.date for s in Session.gen(earliest, latest, [course])} |
+                       {a.date for a in attendances})
+
+        rows = {m.uuid: i for i, m in enumerate(members)}
+        columns = {d: j for j, d in enumerate(dates)}
+        cells = [[None] * len(dates) for _ in members]
+        for a in attendances:
+            cells[rows[a.student.uuid]][columns[a.date]] = a.resolution_code
+
+        return {
+            'members': [{'uuid': m.uuid, 'name': m.name} for m in members],
+            'sessions': dates,
+            'cells': cells,
+        }
+
     @classmethod
     def register_student(
             cls,
@@ -41,11 +75,67 @@ class Attendance(models.Model):
         student.increment_attendance()
         return attendance
 
+    @classmethod
+    def _clear(cls, existing: models.QuerySet):
+        """Deletes the attendances and takes them off their students' session counters
+        in one transaction."""
+        deleted = existing.filter(student=models.OuterRef('pk')).order_by()\
+            .values('student').annotate(n=models.Count('id')).values('n')
+
+        with transaction.atomic():
+            Student.objects.filter(uuid__in=existing.values('student'))\
+                .update(_sessions_attended=models.F('_sessions_attended') - models.Subquery(deleted))
+            existing.delete()
+
     @classmethod
     def clear(cls, student: Student, date: datetime.date):
-        existing = Attendance.objects.filter(student=student, date=date)
-        student.decrement_attendance(existing.count())
-        existing.delete()
+        cls.clear_many([student], date)
+
+    @classmethod
+    def clear_many(cls, students: list[Student], date: datetime.date):
+        existing = Attendance.objects.filter(student__in=students, date=date)
+        counts = dict(existing.values_list('student').annotate(models.Count('id')))
+        if counts:
+            with transaction.atomic():
+                cls._clear(existing)
+                MemberRoster.refresh(list(counts))
+        for student in students:
+            student.decrement_attendance(counts.get(student.uuid, 0))
+
+    @classmethod
+    def _delete_where(cls, condition: str, params: list) -> set:
+        """Deletes the attendances matching an SQL condition without loading them, in
+        statements of at most CASCADE_CHUNK_SIZE rows that each take their attendances off
+        the students' session counters. Returns the UUIDs of the students affected."""
+        table, students = cls._meta.db_table, Student._meta.db_table
+        statement = f'''
+            WITH deleted AS (
+                DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {condition} LIMIT %s)
+                RETURNING student_id
+            ), counts AS (
+                SELECT student_id, count(*) AS n FROM deleted GROUP BY student_id
+            ), decremented AS (
+                UPDATE {students} s SET sessions_attended = s.sessions_attended - counts.n
+                FROM counts WHERE s.uuid = counts.student_id
+            )
+            SELECT student_id, n FROM counts'''
+
+        affected = set()
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute(statement, [*params, CASCADE_CHUNK_SIZE])
+                counts = cursor.fetchall()
+                affected.update(student for student, _ in counts)
+                if sum(n for _, n in counts) < CASCADE_CHUNK_SIZE:
+                    return affected
+
+    @classmethod
+    def clear_course(cls, course: Course) -> set:
+        return cls._delete_where('course_uuid = %s', [course.uuid])
+
+    @classmethod
+    def clear_students(cls, students: list[Student]) -> set:
+        return cls._delete_where('student_id = ANY(%s)', [[s.uuid for s in students]])
 
     @property
     def course(self):
@@ -67,6 +157,14 @@ class Attendance(models.Model):
     def is_complementary(self):
         return self.complementary
 
+    @property
+    def resolution_code(self) -> int:
+        if self.paid:
+            return self.PAID
+        if self.complementary:
+            return self.COMPLEMENTARY
+        return self.ATTENDING
+
     def mark_as_complementary(self):
         self.complementary = True
         self.paid = False
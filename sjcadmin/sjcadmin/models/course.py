@@ -1,9 +1,10 @@
 from datetime import datetime
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.db import models, transaction
 from uuid import uuid4
 
 from ..errors import *
+from .tenant import Tenant
 
 
 class Course(models.Model):
@@ -34,6 +35,17 @@ class Course(models.Model):
     def __str__(self):
         return self._label
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Tenant.bump_course_version(self.tenant_uuid)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            Tenant.bump_course_version(self.tenant_uuid)
+        return deleted
+
     @classmethod
     def make(cls, label: str, days: list[int], dates: list[datetime.date]):
         return cls(
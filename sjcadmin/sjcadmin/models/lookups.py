@@ -0,0 +1,14 @@
+from django.db import models
+from django.db.models.lookups import IContains
+
+
+@models.CharField.register_lookup
+class ILikeContains(IContains):
+    """icontains as ILIKE. Django compiles icontains to UPPER(column) LIKE UPPER(text),
+    which the trigram indexes cannot serve; they can serve ILIKE on the bare column."""
+    lookup_name = 'ilike_contains'
+
+    def as_postgresql(self, compiler, connection):
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs_sql} ILIKE {rhs_sql}', (*lhs_params, *rhs_params)
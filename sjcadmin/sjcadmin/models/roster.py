@@ -0,0 +1,163 @@
+import json
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+from uuid import UUID
+
+from ..renderers import render_json
+from ..schemas import MemberSerializer
+from .course import Course
+
+REBUILD_BATCH_SIZE = 500
+
+_deferred_refreshes = ContextVar('deferred_roster_refreshes', default=None)
+
+
+def _render(data) -> str:
+    return render_json(data).decode()
+
+
+class MemberRoster(models.Model):
+    """A denormalised copy of each member as the roster shows it, kept up to date on
+    every write to the member so the roster can be served from a single query.
+
+    The member is stored pre-rendered as JSON. Subscriptions are stored apart from it
+    because which of them are shown depends on the day the roster is read."""
+
+    student = models.OneToOneField(
+        'Student', primary_key=True, on_delete=models.CASCADE, db_column='student_uuid')
+    club = models.ForeignKey(
+        'Tenant', on_delete=models.CASCADE, db_column='club_uuid')
+
+    name = models.CharField(null=True, max_length=120)
+    sort_name = models.CharField(max_length=120)
+    email = models.EmailField(null=True)
+    course_uuids = ArrayField(models.UUIDField(), default=list)
+
+    member = models.TextField()
+    subscriptions = models.TextField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['club', 'sort_name', 'student'],
+                         name='roster_club_name_member_idx'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='roster_name_trgm_idx'),
+        ]
+
+    @classmethod
+    def _from_member(cls, member, today: date):
+        data = MemberSerializer.represent(member, {'today': today})
+        subscriptions = data.pop('subscriptions')
+
+        return cls(
+            student_id=member.uuid,
+            club_id=member.club_id,
+            name=member.profile_name,
+            sort_name=member.profile_name or '',
+            email=member.profile_email,
+            course_uuids=[c.uuid for c in member.courses],
+            member=_render(data),
+            subscriptions=_render(subscriptions),
+        )
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        """Collects the refreshes requested within the block and makes them as it ends,
+        once for each member however many times they were written. The block and the
+        refreshes share a transaction, so the roster commits with the writes or not at all."""
+        if _deferred_refreshes.get() is not None:
+            yield
+            return
+
+        with transaction.atomic():
+            pending = set()
+            token = _deferred_refreshes.set(pending)
+            try:
+                yield
+            finally:
+                _deferred_refreshes.reset(token)
+            cls.refresh(list(pending))
+
+    @classmethod
+    def refresh(cls, uuids: list[UUID]):
+        """Rebuilds the roster rows of the given members from their current state."""
+        if not uuids:
+            return
+
+        pending = _deferred_refreshes.get()
+        if pending is not None:
+            pending.update(uuids)
+            return
+
+        student = cls._meta.get_field('student').related_model
+        today = date.today()
+        rows = [cls._from_member(m, today) for m in student.fetch_query(uuids=uuids, today=today)]
+
+        with transaction.atomic():
+            cls.objects.filter(student__in=uuids).delete()
+            cls.objects.bulk_create(rows)
+
+    @classmethod
+    def rebuild(cls, missing_only: bool = False) -> int:
+        """Refreshes the roster rows of every member, or only of members without one.
+        Returns the number of rows refreshed."""
+        students = cls._meta.get_field('student').related_model.objects.order_by('uuid')
+        if missing_only:
+            students = students.filter(memberroster__isnull=True)
+
+        uuids = list(students.values_list('uuid', flat=True))
+        for i in range(0, len(uuids), REBUILD_BATCH_SIZE):
+            cls.refresh(uuids[i:i + REBUILD_BATCH_SIZE])
+
+        return len(uuids)
+
+    @classmethod
+    def members_of_course(cls, course: Course) -> list[UUID]:
+        """Members whose roster row shows the course, through a sign-up, an unused
+        payment or a subscription."""
+        student = cls._meta.get_field('student').related_model
+        return list(student.objects.filter(
+            models.Q(_courses=course) |
+            models.Q(subscription__course=course) |
+            models.Q(payment___course=course, payment___used=False)
+        ).distinct().values_list('uuid', flat=True))
+
+    @classmethod
+    def fetch_query(cls, club_uuid: str, course_uuids: list[str] = None, email: str = None, name: str = None,
+                    after: tuple[str, UUID] = None, limit: int = None):
+        """Roster rows ordered by name then UUID and, when paginating, up to `limit` rows
+        following the `after` position."""
+        queryset = cls.objects.filter(club_id=club_uuid)
+
+        if course_uuids:
+            queryset = queryset.filter(course_uuids__overlap=course_uuids)
+
+        if email:
+            queryset = queryset.filter(email=email)
+
+        if name:
+            queryset = queryset.filter(name__ilike_contains=name)
+
+        queryset = queryset.order_by('sort_name', 'student')
+
+        if after:
+            sort_name, uuid = after
+            queryset = queryset.filter(models.Q(sort_name__gt=sort_name) |
+                                       models.Q(sort_name=sort_name, student__gt=uuid))
+
+        queryset = queryset.values_list('member', 'subscriptions', 'sort_name', 'student')
+        return queryset[:limit] if limit else queryset
+
+    @staticmethod
+    def render(member: str, subscriptions: str, today: date) -> str:
+        """The member's roster JSON with the subscriptions unexpired on the day."""
+        if subscriptions != '[]':
+            subscriptions = _render([s for s in json.loads(subscriptions)
+                                     if s['expiryDate'] is not None and s['expiryDate'] > today.isoformat()])
+
+        return member[:-1] + ',"subscriptions":' + subscriptions + '}'
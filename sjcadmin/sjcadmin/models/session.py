@@ -1,11 +1,86 @@
+import numpy as np
+
+from bisect import bisect_left
 from datetime import date, timedelta
 
+# 1970-01-01, day zero of numpy's datetime64, was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def _weekday_mask(days: list[int]) -> int:
+    return sum(1 << d for d in set(days or []) if 0 <= d < 7)
+
+
+class CourseCalendar:
+    """The session dates of a set of courses. Each course's weekdays are indexed as a
+    bitmask and its ad-hoc dates as a sorted list, so sessions over long ranges are found
+    with array arithmetic rather than by testing every day against every course."""
+
+    def __init__(self, courses: list):
+        self.courses = list(courses)
+        self._masks = [_weekday_mask(c.days) for c in self.courses]
+        self._dates = [sorted(set(c.dates)) for c in self.courses]
+        self._index = {id(c): i for i, c in enumerate(self.courses)}
+
+    def _matrix(self, start: date, end: date):
+        """The days in the range, and which courses hold a session on each of them."""
+        days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+        if not self.courses or not len(days):
+            return days, np.zeros((len(days), len(self.courses)), dtype=bool)
+
+        weekday_bits = np.left_shift(1, (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7)
+        sessions = (weekday_bits[:, None] & np.array(self._masks)[None, :]) != 0
+
+        origin = days[0]
+        for i, dates in enumerate(self._dates):
+            if dates:
+                offsets = (np.array(dates, dtype='datetime64[D]') - origin).astype(np.int64)
+                sessions[offsets[(offsets >= 0) & (offsets < len(days))], i] = True
+
+        return days, sessions
+
+    def sessions(self, start: date, end: date) -> list[tuple[date, object]]:
+        """Every session from start to end inclusive, as (date, course) ordered by date and
+        then by the order the courses were given in."""
+        days, sessions = self._matrix(start, end)
+        day_indices, course_indices = np.nonzero(sessions)
+
+        return list(zip(map(days.tolist().__getitem__, day_indices.tolist()),
+                        map(self.courses.__getitem__, course_indices.tolist())))
+
+    def dates(self, start: date, end: date) -> list[date]:
+        """The days from start to end inclusive on which any of the courses holds a session."""
+        days, sessions = self._matrix(start, end)
+        return days[sessions.any(axis=1)].tolist()
+
+    def next_session(self, start: date, course) -> date | None:
+        """The course's first session on or after start."""
+        i = self._index[id(course)]
+        candidates = []
+
+        mask = self._masks[i]
+        if mask:
+            weekday = start.weekday()
+            candidates.append(start + timedelta(days=next(
+                offset for offset in range(7) if mask & (1 << (weekday + offset) % 7))))
+
+        dates = self._dates[i]
+        position = bisect_left(dates, start)
+        if position < len(dates):
+            candidates.append(dates[position])
+
+        return min(candidates, default=None)
+
 
 class Session:
     def __init__(self, sess_date, course):
         self._sess_date = sess_date
         self._course = course
 
+    @property
+    def course(self):
+        return self._course
+
     @property
     def course_uuid(self):
         return self._course.uuid
@@ -19,33 +94,17 @@ class Session:
         if courses is None:
             courses = []
 
-        def daterange(start_date, end_date):
-            end_date += timedelta(days=1)
-            for n in range(int((end_date - start_date).days)):
-                yield start_date + timedelta(n)
-
-        out = []
+        calendar = CourseCalendar(courses)
 
         if exclusive:
-            for d in daterange(start, end):
-                if any(map(lambda c: c.is_session_date(d), courses)):
-                    out.append(cls.make(sess_date=d, course=courses[1]))
-            return out
+            return [cls.make(sess_date=d, course=courses[1]) for d in calendar.dates(start, end)]
 
-        for d in daterange(start, end):
-            for course in courses:
-                if course.is_session_date(d):
-                    out.append(cls.make(sess_date=d, course=course))
-        return out
+        return [cls.make(sess_date=d, course=course) for d, course in calendar.sessions(start, end)]
 
     @classmethod
     def gen_next(cls, start: date, course):
-        if not course.has_future_dates(start):
-            return None
-
-        while not course.is_session_date(start):
-            start += timedelta(days=1)
-        return cls.make(sess_date=start, course=course)
+        next = CourseCalendar([course]).next_session(start, course)
+        return cls.make(sess_date=next, course=course) if next else None
 
     @property
     def date(self):
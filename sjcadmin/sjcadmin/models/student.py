@@ -1,11 +1,15 @@
 from dataclasses import dataclass
 from datetime import datetime, date
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest
 from ...sjcauth.models import User
 from uuid import UUID, uuid4
 
 from ..errors import *
 from .course import Course
+from .roster import MemberRoster
 
 
 @dataclass(frozen=True)
@@ -17,7 +21,36 @@ class Profile:
     address: str
 
 
-class Licence(models.Model):
+class ChangeTracked:
+    """Remembers the column values an instance was loaded or last saved with, so that
+    saving it writes only the columns that have changed since."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._mark_clean()
+        return instance
+
+    def _mark_clean(self):
+        self._clean_values = {f.attname: getattr(self, f.attname)
+                              for f in self._meta.concrete_fields if f.attname in self.__dict__}
+
+    def changed_fields(self) -> list[str] | None:
+        """Columns changed since the instance was loaded, or None if it was not loaded."""
+        clean = self.__dict__.get('_clean_values')
+        if clean is None:
+            return None
+        return [name for name, value in clean.items() if getattr(self, name) != value]
+
+    def save_changes(self):
+        if self._state.adding:
+            self.save()
+        else:
+            self.save(update_fields=self.changed_fields())
+        self._mark_clean()
+
+
+class Licence(ChangeTracked, models.Model):
     number = models.IntegerField()
     expires = models.DateField()
 
@@ -96,7 +129,7 @@ class Subscription(models.Model):
         return subscription
 
 
-class Student(models.Model):
+class Student(ChangeTracked, models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     _creator = models.UUIDField(null=True, db_column='creator_id')
     _creator_name = models.TextField(null=True, max_length=120)
@@ -118,49 +151,89 @@ class Student(models.Model):
 
     join_date = models.DateField(null=False, default=date.today)
 
-    _sessions_attended = 0
+    # Maintained by Attendance.register_student and Attendance.clear
+    _sessions_attended = models.IntegerField(
+        default=0, db_column='sessions_attended')
+
+    class Meta:
+        indexes = [
+            models.Index(models.F('club'), Coalesce('profile_name', models.Value('')), models.F('uuid'),
+                         name='student_club_name_uuid_idx'),
+            GinIndex(fields=['profile_name'], opclasses=['gin_trgm_ops'],
+                     name='student_name_trgm_idx'),
+            GinIndex(fields=['profile_email'], opclasses=['gin_trgm_ops'],
+                     name='student_email_trgm_idx'),
+        ]
 
     _courses = models.ManyToManyField(Course)
 
-    _existing_courses = []
-    _new_courses = []
-    _removed_courses = []
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._attendance_delta = 0
+
+        self._existing_courses = []
+        self._new_courses = []
+        self._removed_courses = []
+
+        self._notes = []
+        self._new_notes = []
+
+        self._unused_payments = []
+        self._new_payments = []
+        self._unused_and_new_payments = self._unused_payments
 
-    _notes = []
-    _new_notes = []
+        self._new_subscriptions = []
+        self._unexpired_subscriptions = []
+        self._unexpired_subscriptions_on = None
 
-    _used_payments = []
-    _unused_payments = []
-    _new_payments = []
-    _unused_and_new_payments = []
-    _new_subscriptions = []
+    @classmethod
+    def _fetch_with_related(cls):
+        """Members with their licence, unused payments, notes and courses prefetched.
+        Used payments are left to get_last_payments, which only loads as many as are shown."""
+        return cls.objects\
+            .select_related('licence', 'club')\
+            .prefetch_related(models.Prefetch('payment_set',
+                                              queryset=Payment.objects.filter(_used=False)
+                                              .select_related('_course').order_by('-_datetime'),
+                                              to_attr='_prefetched_unused_payments'))\
+            .prefetch_related(models.Prefetch('note_set', to_attr='_prefetched_notes'))\
+            .prefetch_related(models.Prefetch('_courses', queryset=Course.objects.order_by('_label', '_uuid'),
+                                              to_attr='_prefetched_courses'))
+
+    @staticmethod
+    def _keyset(queryset, after: tuple[str, UUID] = None, limit: int = None):
+        """Orders members by name then UUID and, when paginating, returns up to `limit`
+        members following the `after` position."""
+        queryset = queryset\
+            .annotate(_sort_name=Coalesce('profile_name', models.Value('')))\
+            .order_by('_sort_name', 'uuid')
+
+        if after:
+            sort_name, uuid = after
+            queryset = queryset.filter(models.Q(_sort_name__gt=sort_name) |
+                                       models.Q(_sort_name=sort_name, uuid__gt=uuid))
+
+        return queryset[:limit] if limit else queryset
+
+    def _init_fetched(self, today: date = None):
+        if today is not None:
+            self._unexpired_subscriptions = self._prefetched_unexpired_subscriptions
+            self._unexpired_subscriptions_on = today
+
+        self._unused_payments = self._prefetched_unused_payments
+        self._unused_and_new_payments = self._unused_payments
+        self._notes = self._prefetched_notes
+        self._existing_courses = self._prefetched_courses
 
     @classmethod
-    def fetch_all(cls, club_uuid: str):
-        objects = cls.objects\
-            .select_related('licence')\
-            .prefetch_related('note_set')\
-            .prefetch_related('payment_set')\
+    def fetch_all(cls, club_uuid: str, after: tuple[str, UUID] = None, limit: int = None):
+        objects = cls._fetch_with_related()\
             .prefetch_related('subscription_set')\
-            .prefetch_related('attendance_set')\
-            .prefetch_related('_courses')\
             .filter(club__uuid=club_uuid)
+        objects = cls._keyset(objects, after, limit)
 
         for o in objects:
-            payments = o.payment_set.all().order_by('-_datetime')
-            o._unused_payments = [p for p in payments if not p.used]
-            o._used_payments = [p for p in payments if p.used]
-            o._new_payments = []
-            o._unused_and_new_payments = o._unused_payments
-
-            o._sessions_attended = o.attendance_set.count()
-
-            o._notes = list(o.note_set.all())
-            o._new_notes = []
-
-            o._existing_courses = list(o._courses.all())
-            o._new_courses = []
-            o._removed_courses = []
+            o._init_fetched()
 
         return objects
 
@@ -170,24 +243,26 @@ class Student(models.Model):
             pk=uuid, club__uuid=club_uuid) if club_uuid else cls.objects.get(pk=uuid)
 
         o._unused_payments = list(o.payment_set.filter(
-            _used=False).order_by('-_datetime'))
-        o._used_payments = list(o.payment_set.filter(
-            _used=True).order_by('-_datetime'))
-        o._new_payments = []
+            _used=False).select_related('_course').order_by('-_datetime'))
         o._unused_and_new_payments = o._unused_payments
+        o._notes = list(o.note_set.all())
+        o._existing_courses = list(o._courses.all())
 
-        o._sessions_attended = o.attendance_set.count()
+        return o
 
-        o._notes = list(o.note_set.all())
-        o._new_notes = []
+    @classmethod
+    def fetch_by_uuids(cls, uuids: list[str], club_uuid: str = None):
+        objects = cls._fetch_with_related()\
+            .prefetch_related('subscription_set')\
+            .filter(uuid__in=uuids)
 
-        o._existing_courses = list(o._courses.all())
-        o._new_courses = []
-        o._removed_courses = []
+        if club_uuid:
+            objects = objects.filter(club__uuid=club_uuid)
 
-        o._new_subscriptions = []
+        for o in objects:
+            o._init_fetched()
 
-        return o
+        return objects
 
     @classmethod
     def fetch_signed_up_for(cls, course: Course, tenant_uuid: str):
@@ -195,44 +270,30 @@ class Student(models.Model):
 
     @classmethod
     def fetch_signed_up_for_multiple(cls, course_uuids: list[str], tenant_uuid: str):
-        objects = cls.objects\
-            .select_related('licence')\
-            .prefetch_related('note_set')\
-            .prefetch_related(models.Prefetch('payment_set', queryset=Payment.objects.order_by('-_datetime')))\
-            .annotate(_sessions_attended=models.Count('attendance'))\
-            .prefetch_related('_courses')\
-            .all().filter(_courses__in=course_uuids)
+        objects = cls._fetch_with_related()\
+            .filter(_courses__in=course_uuids)
 
         for o in objects:
-            payments = o.payment_set.all()
-            o._unused_payments = [p for p in payments if not p.used]
-            o._used_payments = [p for p in payments if p.used]
-            o._new_payments = []
-            o._unused_and_new_payments = o._unused_payments
-
-            o._notes = list(o.note_set.all())
-            o._new_notes = []
-
-            o._existing_courses = list(o._courses.all())
-            o._new_courses = []
-            o._removed_courses = []
+            o._init_fetched()
 
         return objects
 
     @classmethod
-    def fetch_query(cls, course_uuids: list[str] = None, user: User = None, name: str = None, club_uuid: str = None):
-        queryset = cls.objects\
-            .select_related('licence')\
-            .prefetch_related('note_set')\
-            .prefetch_related(models.Prefetch('payment_set', queryset=Payment.objects.order_by('-_datetime')))\
-            .prefetch_related('subscription_set')\
-            .annotate(_sessions_attended=models.Count('attendance'))\
-            .prefetch_related('_courses')\
-            .all()
+    def fetch_query(cls, course_uuids: list[str] = None, user: User = None, name: str = None, club_uuid: str = None, today: date = None,
+                    after: tuple[str, UUID] = None, limit: int = None, uuids: list[UUID] = None):
+        today = today or date.today()
+        queryset = cls._fetch_with_related()\
+            .prefetch_related(models.Prefetch('subscription_set',
+                                              queryset=Subscription.objects.filter(expiry_date__gt=today)
+                                              .select_related('course').order_by('id'),
+                                              to_attr='_prefetched_unexpired_subscriptions'))
 
         if course_uuids:
             queryset = queryset.filter(_courses__in=course_uuids)
 
+        if uuids:
+            queryset = queryset.filter(uuid__in=uuids)
+
         if club_uuid:
             queryset = queryset.filter(club__uuid=club_uuid)
 
@@ -240,23 +301,48 @@ class Student(models.Model):
             queryset = queryset.filter(profile_email=user.email)
 
         if name:
-            queryset = queryset.filter(profile_name__icontains=name)
+            queryset = queryset.filter(profile_name__ilike_contains=name)
+
+        queryset = cls._keyset(queryset, after, limit)
 
         for o in queryset:
-            payments = o.payment_set.all()
-            o._unused_payments = [p for p in payments if not p.used]
-            o._used_payments = [p for p in payments if p.used]
-            o._new_payments = []
-            o._unused_and_new_payments = o._unused_payments
+            o._init_fetched(today)
+
+        return queryset
 
-            o._notes = list(o.note_set.all())
-            o._new_notes = []
+    @classmethod
+    def search(cls, text: str, club_uuid: str, limit: int = 10) -> list[dict]:
+        """Members of a club whose name or email resembles the text, most similar first.
+        Only the fields shown in search results are loaded."""
+        return list(cls._search(text, club_uuid)[:limit])
 
-            o._existing_courses = list(o._courses.all())
-            o._new_courses = []
-            o._removed_courses = []
+    @classmethod
+    def _search(cls, text: str, club_uuid: str) -> models.QuerySet:
+        # Word similarity also matches the beginnings of words, and unlike icontains
+        # it can be served by the trigram indexes
+        similarity = Greatest(TrigramWordSimilarity(text, 'profile_name'),
+                              TrigramWordSimilarity(text, 'profile_email'))
+
+        return cls.objects\
+            .filter(club__uuid=club_uuid)\
+            .filter(cls._resembles(text))\
+            .annotate(_similarity=similarity)\
+            .order_by('-_similarity', 'profile_name', 'uuid')\
+            .values('uuid', 'profile_name', 'profile_email', 'active')
+
+    @staticmethod
+    def _resembles(text: str) -> models.Q:
+        return models.Q(profile_name__trigram_word_similar=text) | \
+            models.Q(profile_email__trigram_word_similar=text)
 
-        return queryset
+    @classmethod
+    def fetch_uuids_for_user(cls, user: User, club_uuid: str = None) -> list[UUID]:
+        queryset = cls.objects.filter(profile_email=user.email)
+
+        if club_uuid:
+            queryset = queryset.filter(club__uuid=club_uuid)
+
+        return list(queryset.values_list('uuid', flat=True))
 
     @classmethod
     def make(
@@ -281,42 +367,81 @@ class Student(models.Model):
             _creator_name=creator.email
         )
 
-        student._sessions_attended = 0
-        student._notes = []
-        student._new_notes = []
-        student._new_courses = []
-        student._removed_courses = []
-        student._new_subscriptions = []
-        student._new_payments = []
-
         return student
 
     def save(self, *args, **kwargs):
-        for note in self._new_notes:
-            note.save()
-        self.note_set.add(*self._new_notes)
-
-        for payment in self._new_payments:
-            payment.save()
-        self.payment_set.add(*self._new_payments)
-        self._new_payments = []
-
-        for payment in self._unused_payments:
-            payment.save()
-
-        for subscription in self._new_subscriptions:
-            subscription.save()
-        self.subscription_set.add(*self._new_subscriptions)
-        self._new_subscriptions = []
-
-        if self.has_licence():
-            self.licence.save()
-
-        self._courses.add(*self._new_courses)
-        # for c in self._removed_courses:
-        #     self._courses.remove(c)
-
-        super().save(*args, **kwargs)
+        """Saves the member along with any children added or changed since it was loaded,
+        writing only what has changed, in one transaction. The member's roster row is
+        refreshed if anything was written."""
+        with transaction.atomic():
+            wrote = False
+            if self.has_licence() and (self.licence._state.adding or self.licence.changed_fields()):
+                self.licence.save_changes()
+                self.licence_id = self.licence.pk
+                wrote = True
+
+            wrote = self._save_row(*args, **kwargs) | wrote
+            wrote = self._save_children() | wrote
+
+            if wrote:
+                MemberRoster.refresh([self.uuid])
+
+    def _save_row(self, *args, **kwargs) -> bool:
+        if not self._state.adding and not args and 'update_fields' not in kwargs:
+            changed = self.changed_fields()
+            if changed is not None:
+                kwargs['update_fields'] = [name for name in changed if name != '_sessions_attended'] + \
+                    (['_sessions_attended'] if self._attendance_delta else [])
+
+        # Apply attendance changes as a delta, so concurrent changes are not overwritten
+        sessions_attended = self._sessions_attended
+        if not self._state.adding:
+            self._sessions_attended = models.F(
+                '_sessions_attended') + self._attendance_delta
+
+        try:
+            super().save(*args, **kwargs)
+            self._attendance_delta = 0
+        finally:
+            self._sessions_attended = sessions_attended
+
+        self._mark_clean()
+        return kwargs.get('update_fields') != []
+
+    def _save_children(self) -> bool:
+        wrote = bool(self._new_notes or self._new_payments or self._new_subscriptions or
+                     self._new_courses or self._removed_courses)
+        used_payments = [p for p in self._unused_payments if p.pk is not None and p.used]
+
+        if self._new_notes:
+            Note.objects.bulk_create(self._new_notes)
+            self._notes = self._new_notes + self._notes
+            self._new_notes = []
+
+        if self._new_payments:
+            Payment.objects.bulk_create(self._new_payments)
+            self._new_payments = []
+
+        if used_payments:
+            Payment.objects.bulk_update(used_payments, ['_used'])
+            wrote = True
+        self._unused_payments[:] = [p for p in self._unused_payments if not p.used]
+
+        if self._new_subscriptions:
+            Subscription.objects.bulk_create(self._new_subscriptions)
+            self._new_subscriptions = []
+
+        if self._new_courses:
+            self._courses.add(*self._new_courses)
+            self._existing_courses = self._existing_courses + self._new_courses
+            self._new_courses = []
+
+        if self._removed_courses:
+            self._courses.remove(*self._removed_courses)
+            self._existing_courses = [c for c in self._existing_courses if c not in self._removed_courses]
+            self._removed_courses = []
+
+        return wrote
 
     def set_profile(self, profile: Profile):
         self.profile_name = profile.name
@@ -420,17 +545,24 @@ class Student(models.Model):
         self._unused_and_new_payments.insert(0, payment)
 
     def has_subscription(self, course, date: date) -> bool:
-        return any(subscription.course.uuid == course.uuid and subscription.expiry_date > date for subscription in self.subscription_set.all())
+        return any(subscription.course_id == course.uuid and subscription.expiry_date > date for subscription in self.subscription_set.all())
 
     def get_unexpired_subscriptions(self, date: date) -> list:
-        return self.subscription_set.filter(expiry_date__gt=date)
+        if date == self._unexpired_subscriptions_on:
+            return self._unexpired_subscriptions
+        return self.subscription_set.filter(expiry_date__gt=date).select_related('course')
 
     def subscribe(self, subscription: Subscription):
         subscription.student = self
         self._new_subscriptions.insert(0, subscription)
 
+    def unsubscribe(self, course: Course):
+        with transaction.atomic():
+            Subscription.objects.filter(student=self, course=course).delete()
+            MemberRoster.refresh([self.uuid])
+
     def get_last_payments(self, n):
-        return sorted(self._used_payments, key=lambda x: x.time, reverse=True)[0:n]
+        return list(self.payment_set.filter(_used=True).select_related('_course').order_by('-_datetime')[0:n])
 
     def sign_up(self, course):
         self._new_courses.append(course)
@@ -440,6 +572,8 @@ class Student(models.Model):
 
     def increment_attendance(self):
         self._sessions_attended += 1
+        self._attendance_delta += 1
 
     def decrement_attendance(self, count: int):
+        # Cleared attendances are taken off the stored counter by Attendance.clear
         self._sessions_attended -= count
@@ -5,3 +5,14 @@ from uuid import uuid4
 class Tenant(models.Model):
     uuid = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     name = models.CharField(null=True, max_length=50)
+
+    # Changes whenever one of the tenant's courses is saved or deleted
+    course_version = models.IntegerField(default=0)
+
+    @classmethod
+    def fetch_course_version(cls, tenant_uuid) -> int:
+        return cls.objects.filter(uuid=tenant_uuid).values_list('course_version', flat=True).first() or 0
+
+    @classmethod
+    def bump_course_version(cls, tenant_uuid):
+        cls.objects.filter(uuid=tenant_uuid).update(course_version=models.F('course_version') + 1)
@@ -0,0 +1,14 @@
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+def render_json(data) -> bytes:
+    """Renders data exactly as DRF's JSONRenderer does with the default settings: compact,
+    without escaping non-ASCII characters other than U+2028 and U+2029."""
+    if data is None:
+        return b''
+
+    rendered = _encoder.encode(data).encode()
+
+    return rendered.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
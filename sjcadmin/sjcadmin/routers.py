@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = 'replica'
+
+_reading_from_replica = ContextVar('reading_from_replica', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Routes reads made within the block to the replica."""
+    token = _reading_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _reading_from_replica.reset(token)
+
+
+def _pin_key(user) -> str:
+    return f'pinned_to_primary:{user.uuid}'
+
+
+def is_pinned_to_primary(request) -> bool:
+    user = request.user
+    return user.is_authenticated and cache.get(_pin_key(user), False)
+
+
+class ReplicaRouter:
+    """Sends reads to the replica inside replica_reads() and everything else to the
+    primary. Only the primary is migrated; the replica follows it through replication."""
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if _reading_from_replica.get() else 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class PrimaryStickinessMiddleware:
+    """Pins a user to the primary for a short while after they make a write, so that they
+    read their own writes while the replica catches up. The pin is kept in the cache
+    rather than the session, as API clients authenticate by token and send no cookie."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') \
+                and not getattr(request, 'read_only', False) \
+                and response.status_code < 400 \
+                and request.user.is_authenticated:
+            cache.set(_pin_key(request.user), True, settings.REPLICA_STICKINESS_SECONDS)
+
+        return response
@@ -1,25 +1,208 @@
 import humps
+
+from collections.abc import Mapping
+from django.db.models.manager import BaseManager
+from functools import lru_cache
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+
+@lru_cache(maxsize=1024)
+def _camel_case(key):
+    return humps.camelize(key)
+
+
+@lru_cache(maxsize=1024)
+def _snake_case(key):
+    return ''.join(['_' + i.lower() if i.isupper() else i for i in key]).lstrip('_')
+
+
+def _camelize_keys(data):
+    """Camel cases the keys of nested dicts, as humps.camelize does, leaving other values alone."""
+    if isinstance(data, str):
+        return data
+    if isinstance(data, list):
+        return [_camelize_keys(item) for item in data]
+    if isinstance(data, Mapping):
+        return {_camel_case(key): _camelize_keys(value) for key, value in data.items()}
+    return data
+
+
+def _snake_case_keys(data):
+    if isinstance(data, str):
+        return data
+    if isinstance(data, list):
+        return [_snake_case_keys(item) for item in data]
+    if isinstance(data, Mapping):
+        return {_snake_case(key) if isinstance(key, str) else key: _snake_case_keys(value)
+                for key, value in data.items()}
+    return data
+
+
+def _is_base_serialiser(field) -> bool:
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    return isinstance(field, BaseSerialiser)
 
 
 class BaseSerialiser(serializers.Serializer):
+    """Exchanges data with camelCase keys. The keys of each class's fields are translated
+    through tables built when the class is defined. Nested serialisers translate their own
+    keys; the values of other fields are translated recursively."""
+
+    _camel_keys: dict[str, str] = {}
+    _snake_keys: dict[str, str] = {}
+    _nested: frozenset[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._camel_keys = {name: humps.camelize(name) for name in cls._declared_fields}
+        cls._snake_keys = {camel: name for name, camel in cls._camel_keys.items()}
+        cls._nested = frozenset(name for name, field in cls._declared_fields.items()
+                                if _is_base_serialiser(field))
+
     def to_representation(self, instance):
-        return humps.camelize(super().to_representation(instance))
+        camel_keys, nested = self._camel_keys, self._nested
+        return {camel_keys.get(key) or _camel_case(key): value if key in nested else _camelize_keys(value)
+                for key, value in super().to_representation(instance).items()}
+
+    @classmethod
+    def represent(cls, instance, context: dict = None) -> dict:
+        """The same representation as `cls(instance, context=context).data`, built by a
+        plan compiled once per class with the keys already camelCased."""
+        plan = cls.__dict__.get('_plan')
+        if plan is None:
+            plan = cls._plan = _compile(cls)
+
+        return plan(instance, {} if context is None else context)
 
     def to_internal_value(self, data):
-        # Convert keys from camelCase to snake_case
-        data = self.camelize_keys_to_snake_case(data)
-        # Call the parent class's to_internal_value method
-        return super().to_internal_value(data)
+        return super().to_internal_value(self.camelize_keys_to_snake_case(data))
 
     def camelize_keys_to_snake_case(self, data):
         if isinstance(data, list):
             return [self.camelize_keys_to_snake_case(item) for item in data]
-        elif isinstance(data, dict):
-            return {self.camelize_to_snake_case(key): value for key, value in data.items()}
-        else:
+        if not isinstance(data, Mapping):
             return data
 
+        snake_keys, nested = self._snake_keys, self._nested
+        converted = {}
+        for key, value in data.items():
+            name = snake_keys.get(key) or self.camelize_to_snake_case(key)
+            converted[name] = value if name in nested else _snake_case_keys(value)
+
+        return converted
+
     def camelize_to_snake_case(self, key):
-        # Convert camelCase to snake_case
-        return ''.join(['_' + i.lower() if i.isupper() else i for i in key]).lstrip('_')
+        return _snake_case(key)
+
+
+def _convert(cls, field):
+    """How a field's attribute is represented, and whether that needs the context."""
+    if isinstance(field, serializers.ListSerializer) and isinstance(field.child, BaseSerialiser):
+        child = type(field.child).represent
+
+        def many(value, context):
+            items = value.all() if isinstance(value, BaseManager) else value
+            return [child(item, context) for item in items]
+        return many, True
+
+    if isinstance(field, BaseSerialiser):
+        return type(field).represent, True
+
+    if isinstance(field, serializers.SerializerMethodField):
+        method_name = field.method_name
+
+        def method(value, context):
+            return _camelize_keys(getattr(cls(context=context), method_name)(value))
+        return method, True
+
+    if type(field) is serializers.CharField:
+        return str, False
+
+    if type(field) is serializers.UUIDField and field.uuid_format == 'hex_verbose':
+        return str, False
+
+    if type(field) is serializers.IntegerField:
+        return int, False
+
+    to_representation = field.to_representation
+    return lambda value: _camelize_keys(to_representation(value)), False
+
+
+def _compile(cls):
+    steps = [(cls._camel_keys.get(field.field_name) or _camel_case(field.field_name),
+              field.get_attribute, *_convert(cls, field))
+             for field in cls().fields.values() if not field.write_only]
+
+    def plan(instance, context):
+        data = {}
+        for key, get_attribute, convert, needs_context in steps:
+            try:
+                attribute = get_attribute(instance)
+            except SkipField:
+                continue
+
+            if attribute is None:
+                data[key] = None
+            elif needs_context:
+                data[key] = convert(attribute, context)
+            else:
+                data[key] = convert(attribute)
+
+        return data
+
+    return plan
+
+
+class CourseSerializer(BaseSerialiser):
+    uuid = serializers.UUIDField()
+    label = serializers.CharField(required=False, allow_blank=True)
+
+
+class SessionSerializer(BaseSerialiser):
+    date = serializers.DateField()
+    course = CourseSerializer()
+
+
+class LicenceSerializer(BaseSerialiser):
+    number = serializers.IntegerField()
+    expiry_date = serializers.DateField(source='expires')
+
+
+class PaymentSerializer(BaseSerialiser):
+    course = CourseSerializer()
+    datetime = serializers.DateTimeField(required=False, source='time')
+    used = serializers.BooleanField(required=False)
+
+
+class SubscriptionSerializer(BaseSerialiser):
+    course = CourseSerializer()
+    type = serializers.CharField()
+    expiry_date = serializers.DateField(required=False, allow_null=True)
+
+
+class MemberSerializer(BaseSerialiser):
+    uuid = serializers.CharField()
+    name = serializers.CharField()
+    active = serializers.BooleanField()
+    email = serializers.CharField()
+    phone = serializers.CharField()
+    date_of_birth = serializers.DateField()
+    address = serializers.CharField()
+    join_date = serializers.DateField()
+    remaining_trial_sessions = serializers.IntegerField()
+    added_by = serializers.CharField()
+    club_name = serializers.CharField()
+
+    licence = LicenceSerializer(required=False)
+    courses = CourseSerializer(many=True, read_only=True)
+    unused_payments = PaymentSerializer(
+        many=True, read_only=True, source='get_unused_payments')
+
+    subscriptions = serializers.SerializerMethodField()
+
+    def get_subscriptions(self, obj):
+        today = self.context['today']
+        subscriptions = obj.get_unexpired_subscriptions(today)
+        return [SubscriptionSerializer.represent(s) for s in subscriptions]
@@ -1,7 +1,13 @@
 import boto3
 import json
+import logging
 import os
 
+from django.db import transaction
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
 
 class Producer:
     _instance = None
@@ -26,3 +32,20 @@ class Producer:
 
 def get_producer() -> Producer:
     return Producer()
+
+
+def publish_cascade(course_uuid: UUID = None, member_uuids: list[UUID] = None):
+    """Asks the attendance service to delete every attendance of a deleted course or of
+    deleted members, once the current transaction has committed."""
+    message = {'action': 'cascade', 'data': {
+        'courseUuid': str(course_uuid) if course_uuid else None,
+        'memberUuids': [str(m) for m in member_uuids or []],
+    }}
+
+    def publish():
+        try:
+            get_producer().publish(message)
+        except Exception:
+            logger.exception('Failed to publish attendance cascade %s', message['data'])
+
+    transaction.on_commit(publish)
@@ -0,0 +1,59 @@
+import pytest
+
+from django.db import connections
+from time import perf_counter
+
+from sjcadmin.sjcadmin.models import Course, Tenant
+from sjcadmin.sjcauth.models import User
+
+
+@pytest.fixture(autouse=True)
+def replica_shares_default_connection(db):
+    # The replica mirrors default under test; share its connection so that reads
+    # routed to the replica see the test's uncommitted writes
+    replica = connections['replica']
+    connections['replica'] = connections['default']
+    yield
+    connections['replica'] = replica
+
+
+@pytest.fixture
+def club(db):
+    return Tenant.objects.create(name='Test club')
+
+
+@pytest.fixture
+def courses(request, club):
+    """The club's weekly courses: a Monday and a Tuesday course, or the (label, days)
+    pairs given by parametrising this fixture indirectly."""
+    specs = getattr(request, 'param', [('Monday', [0]), ('Tuesday', [1])])
+    return [Course.objects.create(_label=label, _days=days, tenant_uuid=club.uuid) for label, days in specs]
+
+
+@pytest.fixture
+def course(courses):
+    return courses[0]
+
+
+@pytest.fixture
+def staff(club):
+    return User.objects.create_user(
+        'staff@example.com', is_staff=True, tenant_uuid=club.uuid)
+
+
+@pytest.fixture
+def staff_client(client, staff):
+    client.force_login(staff)
+    return client
+
+
+@pytest.fixture
+def timed():
+    """Times a callable, as the mean of a number of runs after one to warm up."""
+    def timed(run, rounds: int = 3) -> float:
+        run()
+        start = perf_counter()
+        for _ in range(rounds):
+            run()
+        return (perf_counter() - start) / rounds
+    return timed
@@ -0,0 +1,112 @@
+import pytest
+
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+
+from sjcadmin.sjcadmin.models import Attendance, Student
+
+
+@pytest.fixture
+def member(club, course):
+    member = Student.objects.create(
+        profile_name='Trial member',
+        profile_email='trial@example.com',
+        allowed_trial_sessions=3,
+        club=club,
+    )
+    member._courses.add(course)
+    return member
+
+
+def _log(client, member, course, day: date):
+    return client.post(f'/api/members/{member.uuid}/attendance/log', {
+        'course': {'uuid': str(course.uuid)},
+        'date': day.isoformat(),
+        'payment': 'comp',
+    }, content_type='application/json')
+
+
+def _stored(member) -> int:
+    return Student.objects.values_list('_sessions_attended', flat=True).get(pk=member.pk)
+
+
+def test_logging_attendance_increments_counter(staff_client, course, member):
+    today = date.today()
+
+    assert _log(staff_client, member, course, today).status_code == 200
+    assert _log(staff_client, member, course, today - timedelta(days=7)).status_code == 200
+
+    assert _stored(member) == 2
+    assert Student.fetch_by_uuid(member.uuid).remaining_trial_sessions == 1
+
+
+def test_relogging_attendance_for_same_date_does_not_double_count(staff_client, course, member):
+
+    _log(staff_client, member, course, date.today())
+    _log(staff_client, member, course, date.today())
+
+    assert _stored(member) == 1
+
+
+def test_deleting_attendance_decrements_counter(staff_client, course, member):
+    today = date.today()
+    _log(staff_client, member, course, today)
+    _log(staff_client, member, course, today - timedelta(days=7))
+
+    response = staff_client.post(f'/api/members/{member.uuid}/attendance/delete', {
+        'course': {'uuid': str(course.uuid)},
+        'date': today.isoformat(),
+    }, content_type='application/json')
+
+    assert response.status_code == 204
+    assert _stored(member) == 1
+
+
+def test_deleting_course_decrements_counters(staff_client, courses, member):
+    course, other = courses
+    member._courses.add(other)
+    _log(staff_client, member, course, date.today())
+    _log(staff_client, member, other, date.today() - timedelta(days=1))
+
+    response = staff_client.post(f'/api/courses/{course.uuid}/delete')
+
+    assert response.status_code == 204
+    assert _stored(member) == 1
+
+
+def test_saving_stale_member_does_not_overwrite_counter(course, member):
+    stale = Student.fetch_by_uuid(member.uuid)
+
+    fresh = Student.fetch_by_uuid(member.uuid)
+    Attendance.register_student(fresh, course=course, date=date.today()).save()
+    fresh.save()
+
+    stale.profile_name = 'Renamed'
+    stale.save()
+
+    assert _stored(member) == 1
+
+
+def test_member_query_does_not_count_attendance(staff_client, club, member):
+    with CaptureQueriesContext(connection) as queries:
+        Student.fetch_all(club_uuid=club.uuid)
+
+    assert not any('sjcadmin_attendance' in q['sql'] for q in queries.captured_queries)
+
+
+def test_rebuild_command_recomputes_counters(course, member):
+    Attendance.objects.create(student=member, _course=course, date=date.today())
+    Student.objects.filter(pk=member.pk).update(_sessions_attended=5)
+
+    with pytest.raises(CommandError):
+        call_command('rebuild_attendance_counters', '--verify', stdout=StringIO())
+    assert _stored(member) == 5
+
+    call_command('rebuild_attendance_counters', stdout=StringIO())
+
+    assert _stored(member) == 1
+    call_command('rebuild_attendance_counters', '--verify', stdout=StringIO())
@@ -0,0 +1,116 @@
+import pytest
+
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.models import Attendance, Course, MemberRoster, Student
+from sjcadmin.sjcadmin.models import attendance
+from sjcadmin.sjcadmin.services import attendance as attendance_service
+
+WEEKS = 25
+
+
+@pytest.fixture
+def members(club, courses):
+    """Two members who have attended both courses every week, one of them without signing up."""
+    members = [Student.objects.create(profile_name=name, allowed_trial_sessions=2, club=club,
+                                      _sessions_attended=2 * WEEKS)
+               for name in ['Signed up', 'Drop-in']]
+    for course in courses:
+        members[0].sign_up(course)
+    members[0].save()
+
+    Attendance.objects.bulk_create([
+        Attendance(student=m, _course=c, date=date(2023, 1, 2) + timedelta(weeks=w, days=d))
+        for m in members for d, c in enumerate(courses) for w in range(WEEKS)])
+
+    return members
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """The messages published to the attendance topic."""
+    messages = []
+
+    class Producer:
+        def publish(self, msg: dict):
+            messages.append(msg)
+
+    monkeypatch.setattr(attendance_service, 'get_producer', Producer)
+    return messages
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(attendance, 'CASCADE_CHUNK_SIZE', 7)
+
+
+def _stored(member) -> int:
+    return Student.objects.values_list('_sessions_attended', flat=True).get(pk=member.pk)
+
+
+def test_deleting_course_cascades_in_chunks(courses, members, staff_client, published, small_chunks,
+                                            django_capture_on_commit_callbacks):
+    monday, tuesday = courses
+
+    with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as queries:
+        response = staff_client.post(f'/api/courses/{monday.uuid}/delete')
+
+    assert response.status_code == 204
+    assert not Attendance.objects.filter(_course=monday.uuid).exists()
+    assert Attendance.objects.filter(_course=tuesday).count() == 2 * WEEKS
+
+    # Attendances are deleted in chunks by set-based statements, leaving the collector nothing to load
+    cascades = [q['sql'] for q in queries.captured_queries if q['sql'].lstrip().startswith('WITH deleted AS')]
+    assert len(cascades) == 2 * WEEKS // 7 + 1
+    assert not any(q['sql'].startswith('DELETE FROM "sjcadmin_attendance"') or
+                   q['sql'].startswith('UPDATE "sjcadmin_attendance"') for q in queries.captured_queries)
+
+    # Every member who attended has their counter and roster row updated, signed up or not
+    assert [_stored(m) for m in members] == [WEEKS, WEEKS]
+    drop_in = MemberRoster.objects.get(student=members[1])
+    assert f'"remainingTrialSessions":{2 - WEEKS},' in drop_in.member
+
+    # And the attendance service is asked to cascade once
+    assert published == [{'action': 'cascade', 'data': {'courseUuid': str(monday.uuid), 'memberUuids': []}}]
+
+
+def test_deleting_member_cascades(members, staff_client, published, django_capture_on_commit_callbacks):
+    member = members[1]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = staff_client.post(f'/api/members/{member.uuid}/delete')
+
+    assert response.status_code == 204
+    assert not Student.objects.filter(pk=member.pk).exists()
+    assert not Attendance.objects.filter(student=member.pk).exists()
+    assert Attendance.objects.filter(student=members[0]).count() == 2 * WEEKS
+    assert published == [{'action': 'cascade', 'data': {'courseUuid': None, 'memberUuids': [str(member.uuid)]}}]
+
+
+def test_deleting_member_through_old_api_cascades(members, staff_client, published,
+                                                  django_capture_on_commit_callbacks):
+    member = members[0]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = staff_client.post(f'/api/members/delete/{member.uuid}')
+
+    assert response.status_code == 200
+    assert not Student.objects.filter(pk=member.pk).exists()
+    assert not Attendance.objects.filter(student=member.pk).exists()
+    assert published == [{'action': 'cascade', 'data': {'courseUuid': None, 'memberUuids': [str(member.uuid)]}}]
+
+
+def test_failing_to_publish_does_not_fail_the_deletion(course, members, staff_client, monkeypatch,
+                                                       django_capture_on_commit_callbacks):
+    def unavailable():
+        raise ConnectionError('SNS is unavailable')
+
+    monkeypatch.setattr(attendance_service, 'get_producer', unavailable)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = staff_client.post(f'/api/courses/{course.uuid}/delete')
+
+    assert response.status_code == 204
+    assert not Course.objects.filter(pk=course.pk).exists()
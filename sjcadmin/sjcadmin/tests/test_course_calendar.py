@@ -0,0 +1,110 @@
+import pytest
+import random
+
+from datetime import date, timedelta
+
+from sjcadmin.sjcadmin.models import Course, CourseCalendar, Session
+
+COURSES = 300
+YEARS = 3
+START = date(2021, 3, 15)
+END = START + timedelta(days=365 * YEARS)
+
+
+def _courses(n: int, seed: int = 0) -> list[Course]:
+    """Weekly courses, one-off courses and courses with both, in no particular order."""
+    rng = random.Random(seed)
+    span = (END - START).days + 60
+
+    def adhoc_dates():
+        return [START - timedelta(days=30) + timedelta(days=rng.randrange(span)) for _ in range(rng.randrange(12))]
+
+    return [Course.make(
+        label=f'Course {i}',
+        days=rng.sample(range(7), rng.randrange(3)) if i % 4 else [],
+        dates=adhoc_dates() if i % 3 else [],
+    ) for i in range(n)]
+
+
+def _legacy_gen(start: date, end: date, courses: list) -> list[tuple[date, Course]]:
+    """The previous generator, which tested every day against every course."""
+    out = []
+    d = start
+    while d <= end:
+        for course in courses:
+            if course.is_session_date(d):
+                out.append((d, course))
+        d += timedelta(days=1)
+    return out
+
+
+def _legacy_next(start: date, course: Course) -> date | None:
+    """The previous next-session search, which stepped forward one day at a time."""
+    if not course.has_future_dates(start):
+        return None
+
+    while not course.is_session_date(start):
+        start += timedelta(days=1)
+    return start
+
+
+def test_sessions_match_day_by_day_generation():
+    courses = _courses(40)
+
+    sessions = Session.gen(START, END, courses)
+
+    assert [(s.date, s._course) for s in sessions] == _legacy_gen(START, END, courses)
+
+
+def test_exclusive_sessions_are_the_days_with_any_session():
+    courses = _courses(40)
+
+    sessions = Session.gen(START, END, courses, exclusive=True)
+
+    assert [s.date for s in sessions] == sorted({d for d, _ in _legacy_gen(START, END, courses)})
+    assert all(s._course is courses[1] for s in sessions)
+
+
+def test_sessions_of_an_empty_range_or_no_courses():
+    assert Session.gen(END, START, _courses(5)) == []
+    assert Session.gen(START, END, []) == []
+    assert Session.gen(START, END) == []
+
+
+def test_next_session_matches_stepping_forward():
+    courses = _courses(100)
+
+    for course in courses:
+        for start in [START, START + timedelta(days=3), END, END + timedelta(days=100)]:
+            next = Session.gen_next(start, course)
+            assert (next.date if next else None) == _legacy_next(start, course)
+
+
+def test_next_session_of_a_course_with_only_past_dates():
+    course = Course.make(label='One-off', days=[], dates=[date(2020, 1, 1)])
+
+    assert Session.gen_next(date(2023, 1, 1), course) is None
+
+
+@pytest.mark.benchmark
+def test_benchmark_sessions_over_years_of_many_courses(timed):
+    courses = _courses(COURSES)
+
+    # When I generate every session with the day-by-day loop and with the calendar
+    legacy = timed(lambda: _legacy_gen(START, END, courses))
+    current = timed(lambda: CourseCalendar(courses).sessions(START, END))
+
+    # Then the calendar is faster
+    assert current < legacy
+
+
+@pytest.mark.benchmark
+def test_benchmark_next_session_of_one_off_courses(timed):
+    courses = [Course.make(label='One-off', days=[], dates=[END]) for _ in range(COURSES)]
+
+    # When I find each course's next session by stepping forward and with the calendar
+    legacy = timed(lambda: [_legacy_next(START, c) for c in courses])
+    current = timed(lambda: [Session.gen_next(START, c) for c in courses])
+
+    # Then the calendar is faster
+    assert current < legacy
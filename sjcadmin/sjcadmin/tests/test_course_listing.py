@@ -0,0 +1,50 @@
+import pytest
+
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.controllers.api.courses import _course_listing
+
+
+pytestmark = pytest.mark.parametrize('courses', [[('Every day', list(range(7)))]], ids=['Every day'], indirect=True)
+
+
+def _course_queries(queries) -> list[str]:
+    return [q['sql'] for q in queries.captured_queries if '"sjcadmin_course"' in q['sql']]
+
+
+def test_listing_includes_the_next_session(courses, staff_client):
+    [course] = staff_client.get('/api/courses').json()
+
+    assert course['label'] == 'Every day'
+    assert course['nextSession'] == date.today().isoformat()
+
+
+def test_listing_is_served_from_the_cache(courses, staff_client):
+    first = staff_client.get('/api/courses').json()
+
+    with CaptureQueriesContext(connection) as queries:
+        second = staff_client.get('/api/courses').json()
+
+    assert second == first
+    assert _course_queries(queries) == []
+
+
+def test_listing_follows_course_creation_and_deletion(courses, staff_client):
+    staff_client.get('/api/courses')
+
+    created = staff_client.post('/api/courses/create', {'label': 'Saturday', 'days': [5]},
+                                content_type='application/json').json()
+    assert sorted(c['label'] for c in staff_client.get('/api/courses').json()) == ['Every day', 'Saturday']
+
+    staff_client.post(f"/api/courses/{created['uuid']}/delete")
+    assert [c['label'] for c in staff_client.get('/api/courses').json()] == ['Every day']
+
+
+def test_listing_recomputes_next_sessions_each_day(club, courses):
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+
+    assert _course_listing(club.uuid, today)[0]['nextSession'] == today
+    assert _course_listing(club.uuid, tomorrow)[0]['nextSession'] == tomorrow
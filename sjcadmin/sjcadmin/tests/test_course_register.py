@@ -0,0 +1,68 @@
+import pytest
+
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.models import Attendance, Student
+
+# A term of Mondays and Thursdays
+TERM = {'start': '2023-01-02', 'end': '2023-03-26'}
+MEMBERS = 30
+
+pytestmark = pytest.mark.parametrize('courses', [[('Monday and Thursday', [0, 3])]],
+                                     ids=['Monday and Thursday'], indirect=True)
+
+
+def _member(club, name: str) -> Student:
+    return Student.objects.create(profile_name=name, allowed_trial_sessions=2, club=club)
+
+
+def _register(client, course, **query):
+    response = client.get(f'/api/courses/{course.uuid}/register', query or TERM)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_register_is_a_matrix_of_resolution_codes(club, course, staff_client):
+    bob, alice = _member(club, 'Bob'), _member(club, 'Alice')
+    Attendance.objects.create(student=alice, _course=course, date=date(2023, 1, 2), paid=True)
+    Attendance.objects.create(student=alice, _course=course, date=date(2023, 1, 5), complementary=True)
+    Attendance.objects.create(student=bob, _course=course, date=date(2023, 1, 5))
+    Attendance.objects.create(student=bob, _course=course, date=date(2023, 1, 7))    # A Saturday
+    Attendance.objects.create(student=bob, _course=course, date=date(2023, 4, 3))    # After the term
+
+    register = _register(staff_client, course, start='2023-01-02', end='2023-01-09')
+
+    assert register == {
+        'members': [{'uuid': str(alice.uuid), 'name': 'Alice'}, {'uuid': str(bob.uuid), 'name': 'Bob'}],
+        'sessions': ['2023-01-02', '2023-01-05', '2023-01-07', '2023-01-09'],
+        'cells': [
+            [Attendance.PAID, Attendance.COMPLEMENTARY, None, None],
+            [None, Attendance.ATTENDING, Attendance.ATTENDING, None],
+        ],
+    }
+
+
+def test_register_is_built_from_one_query(club, course, staff_client):
+    members = [_member(club, f'Member {i}') for i in range(MEMBERS)]
+    Attendance.objects.bulk_create([
+        Attendance(student=m, _course=course, date=date(2023, 1, 2) + timedelta(weeks=w), paid=True)
+        for m in members for w in range(12)])
+
+    with CaptureQueriesContext(connection) as queries:
+        register = _register(staff_client, course)
+
+    register_queries = [q['sql'] for q in queries.captured_queries
+                        if '"sjcadmin_attendance"' in q['sql'] or '"sjcadmin_student"' in q['sql']]
+    assert len(register_queries) == 1
+    assert len(register['members']) == MEMBERS
+    assert len(register['sessions']) == 24
+    assert all(row.count(Attendance.PAID) == 12 for row in register['cells'])
+
+
+def test_register_rejects_invalid_ranges(course, staff_client):
+
+    response = staff_client.get(f'/api/courses/{course.uuid}/register', {'start': '2023-03-26', 'end': '2023-01-02'})
+
+    assert response.status_code == 400
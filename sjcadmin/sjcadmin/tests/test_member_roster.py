@@ -0,0 +1,228 @@
+import json
+import pytest
+
+from datetime import date, datetime, timedelta, timezone
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+from rest_framework.renderers import JSONRenderer
+
+from sjcadmin.sjcadmin.models import Attendance, MemberRoster, Student
+from sjcadmin.sjcadmin.models.student import Licence, Payment, Subscription
+from sjcadmin.sjcadmin.schemas import MemberSerializer
+
+
+@pytest.fixture
+def make_member(club, courses, staff):
+    """Makes a member signed up to, paid for and subscribed to every course."""
+    def make_member(name: str, licenced: bool = True) -> Student:
+        today = date.today()
+
+        member = Student.make(name=name, creator=staff, licence=Licence(
+            number=1, expires=today + timedelta(days=365)) if licenced else None)
+        member.club = club
+        member.profile_email = f'{name.lower()}@example.com'
+        for course in courses:
+            member.sign_up(course)
+            member.take_payment(Payment.make(datetime.now(timezone.utc), course))
+            member.subscribe(Subscription.make('time', today + timedelta(days=30), course))
+            member.subscribe(Subscription.make('time', today - timedelta(days=30), course))
+        member.save()
+
+        return member
+    return make_member
+
+
+def _legacy_roster(club) -> bytes:
+    today = date.today()
+    members = Student.fetch_query(club_uuid=club.uuid, today=today)
+    return JSONRenderer().render([MemberSerializer(m, context={'today': today}).data for m in members])
+
+
+def _roster(client, **data) -> list[dict]:
+    response = client.post('/api/members/query', data, content_type='application/json')
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_roster_is_byte_identical_to_serialised_members(make_member, club, staff_client):
+    for name in ['Carol', 'Alice', 'Bob   Line', 'Émile']:
+        make_member(name)
+    make_member('Trial', licenced=False)
+
+    response = staff_client.post('/api/members/query', {}, content_type='application/json')
+
+    assert response['Content-Type'] == 'application/json'
+    assert response.content == _legacy_roster(club)
+
+
+def test_roster_is_served_from_one_query(make_member, staff_client):
+    for name in ['Carol', 'Alice', 'Bob']:
+        make_member(name)
+
+    with CaptureQueriesContext(connection) as queries:
+        _roster(staff_client)
+
+    member_queries = [q['sql'] for q in queries.captured_queries if '"sjcadmin_' in q['sql']]
+    assert len(member_queries) == 1
+    assert '"sjcadmin_memberroster"' in member_queries[0]
+
+
+def test_roster_filters_by_course_without_duplicates(make_member, courses, staff_client):
+    monday, _ = courses
+    make_member('Carol')
+
+    members = _roster(staff_client, courses=[{'uuid': str(monday.uuid)}])
+
+    assert [m['name'] for m in members] == ['Carol']
+
+
+def test_roster_filters_by_name(make_member, staff_client):
+    for name in ['Carol', 'Caroline', 'Bob']:
+        make_member(name)
+
+    members = _roster(staff_client, name='CAROL')
+
+    assert [m['name'] for m in members] == ['Carol', 'Caroline']
+
+
+def test_roster_name_filter_uses_the_trigram_index():
+    # Explained without the club, which on a small table the planner would rather filter
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+
+    plan = MemberRoster.objects.filter(name__ilike_contains='carol').explain()
+
+    assert 'roster_name_trgm_idx' in plan
+    assert 'Seq Scan' not in plan
+
+
+def test_roster_hides_subscriptions_that_have_since_expired(make_member):
+    member = make_member('Carol')
+    row = MemberRoster.objects.get(student=member)
+
+    later = date.today() + timedelta(days=31)
+    today = MemberRoster.render(row.member, row.subscriptions, date.today())
+    after_expiry = MemberRoster.render(row.member, row.subscriptions, later)
+
+    assert len(json.loads(today)['subscriptions']) == 2
+    assert json.loads(after_expiry)['subscriptions'] == []
+
+
+def test_roster_follows_payments_and_subscriptions(make_member, courses, staff_client):
+    monday, _ = courses
+    member = make_member('Carol')
+
+    staff_client.post(f'/api/members/{member.uuid}/payments/add', {
+        'course': {'uuid': str(monday.uuid)},
+    }, content_type='application/json')
+    staff_client.post(f'/api/members/{member.uuid}/subscriptions/cancel', {
+        'course': {'uuid': str(monday.uuid)},
+    }, content_type='application/json')
+
+    [carol] = _roster(staff_client)
+    assert len(carol['unusedPayments']) == 3
+    assert [s['course']['label'] for s in carol['subscriptions']] == ['Tuesday']
+
+
+def test_roster_follows_attendance(make_member, courses, staff_client):
+    monday, _ = courses
+    member = make_member('Trial', licenced=False)
+    attendance = {'course': {'uuid': str(monday.uuid)}, 'date': date.today().isoformat(), 'payment': 'comp'}
+
+    staff_client.post(f'/api/members/{member.uuid}/attendance/log', attendance, content_type='application/json')
+    assert _roster(staff_client)[0]['remainingTrialSessions'] == 1
+
+    staff_client.post(f'/api/members/{member.uuid}/attendance/delete', attendance, content_type='application/json')
+    assert _roster(staff_client)[0]['remainingTrialSessions'] == 2
+
+
+def test_logging_attendance_refreshes_each_roster_row_once(make_member, courses, staff_client):
+    monday, _ = courses
+    members = [make_member(name, licenced=False) for name in ['Alice', 'Bob', 'Carol']]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = staff_client.post('/api/members/attendance/log', {
+            'course': {'uuid': str(monday.uuid)},
+            'date': date.today().isoformat(),
+            'attendances': [{'member': {'uuid': str(m.uuid)}, 'payment': 'comp'} for m in members],
+        }, content_type='application/json')
+
+    assert response.status_code == 200
+    refreshes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "sjcadmin_memberroster"')]
+    assert len(refreshes) == 1
+    assert [m['remainingTrialSessions'] for m in _roster(staff_client)] == [1, 1, 1]
+
+
+def test_logged_attendance_commits_with_the_roster(make_member, courses, staff_client, monkeypatch):
+    monday, _ = courses
+    members = [make_member(name, licenced=False) for name in ['Alice', 'Bob']]
+
+    def fail(*args):
+        raise RuntimeError('Roster unavailable')
+
+    monkeypatch.setattr(MemberRoster, '_from_member', fail)
+    staff_client.post('/api/members/attendance/log', {
+        'course': {'uuid': str(monday.uuid)},
+        'date': date.today().isoformat(),
+        'attendances': [{'member': {'uuid': str(m.uuid)}, 'payment': 'comp'} for m in members],
+    }, content_type='application/json')
+
+    assert not Attendance.objects.filter(student__in=members).exists()
+
+
+def test_roster_follows_profile_and_licence(make_member, staff_client):
+    member = make_member('Trial', licenced=False)
+
+    staff_client.post(f'/api/members/{member.uuid}/licences/add', {
+        'number': 123, 'expiryDate': (date.today() + timedelta(days=365)).isoformat(),
+    }, content_type='application/json')
+    staff_client.post(f'/api/members/{member.uuid}/deactivate')
+
+    [trial] = _roster(staff_client)
+    assert trial['licence']['number'] == 123
+    assert trial['active'] is False
+
+
+def test_roster_follows_course_deletion(make_member, club, courses, staff_client):
+    monday, _ = courses
+    make_member('Carol')
+
+    staff_client.post(f'/api/courses/{monday.uuid}/delete')
+
+    [carol] = _roster(staff_client)
+    assert [c['label'] for c in carol['courses']] == ['Tuesday']
+    assert all(p['course'] is None or p['course']['label'] == 'Tuesday' for p in carol['unusedPayments'])
+    assert [s['course']['label'] for s in carol['subscriptions']] == ['Tuesday']
+    assert staff_client.post('/api/members/query', {}, content_type='application/json').content == \
+        _legacy_roster(club)
+
+
+def test_roster_follows_sign_ups(club, courses, staff, staff_client):
+    monday, _ = courses
+    member = Student.make(name='Carol', creator=staff)
+    member.club = club
+    member.save()
+
+    staff_client.post(f'/api/members/{member.uuid}/courses/add', {'uuid': str(monday.uuid)},
+                      content_type='application/json')
+
+    [carol] = _roster(staff_client, courses=[{'uuid': str(monday.uuid)}])
+    assert [c['label'] for c in carol['courses']] == ['Monday']
+
+    staff_client.post(f'/api/members/{member.uuid}/courses/remove', {'uuid': str(monday.uuid)},
+                      content_type='application/json')
+
+    assert _roster(staff_client, courses=[{'uuid': str(monday.uuid)}]) == []
+    assert staff_client.post('/api/members/query', {}, content_type='application/json').content == \
+        _legacy_roster(club)
+
+
+def test_rebuild_command_fills_missing_rows(make_member):
+    member = make_member('Carol')
+    MemberRoster.objects.all().delete()
+
+    call_command('rebuild_member_roster', '--missing', stdout=StringIO())
+
+    assert MemberRoster.objects.filter(student=member).exists()
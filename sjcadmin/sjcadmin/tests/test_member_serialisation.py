@@ -0,0 +1,109 @@
+import pytest
+
+from datetime import date, datetime, timedelta, timezone
+from rest_framework.renderers import JSONRenderer
+from uuid import uuid4
+
+from sjcadmin.sjcadmin.models import Course, Student
+from sjcadmin.sjcadmin.models.student import Licence, Payment, Subscription
+from sjcadmin.sjcadmin.renderers import render_json
+from sjcadmin.sjcadmin.schemas import CourseSerializer, MemberSerializer, PaymentSerializer, SubscriptionSerializer
+
+MEMBERS = 1000
+NAMES = ['Alice', 'Émile', 'Bob Line', 'Zoë ', '"Quoted"\\', None]
+
+
+@pytest.fixture
+def club(club):
+    """A club of members with a mix of licences, payments, subscriptions and missing details."""
+    courses = [Course.objects.create(_label=label, _days=[d], tenant_uuid=club.uuid)
+               for d, label in enumerate(['Monday', 'Tuesday ☯'])]
+    today = date.today()
+
+    licences = Licence.objects.bulk_create([Licence(number=i, expires=today + timedelta(days=i))
+                                            for i in range(0, MEMBERS, 2)])
+    members = Student.objects.bulk_create([Student(
+        profile_name=NAMES[i % len(NAMES)],
+        profile_email=f'member{i}@example.com' if i % 3 else None,
+        profile_dob=date(1990, 1, 1) + timedelta(days=i) if i % 4 else None,
+        allowed_trial_sessions=2,
+        licence=licences[i // 2] if i % 2 == 0 else None,
+        club=club,
+    ) for i in range(MEMBERS)])
+
+    Student._courses.through.objects.bulk_create([
+        Student._courses.through(student_id=m.uuid, course_id=c.uuid) for m in members for c in courses])
+    Payment.objects.bulk_create([Payment(
+        _student=m, _course=courses[w % 2] if w else None, _datetime=datetime(2023, 1, 1, 12, 30, w, 12345, tzinfo=timezone.utc))
+        for m in members for w in range(3)])
+    Subscription.objects.bulk_create([Subscription(
+        student=m, course=courses[i % 2], type='time', expiry_date=today + timedelta(days=30))
+        for i, m in enumerate(members)])
+
+    return club
+
+
+def _members(club):
+    return list(Student.fetch_query(club_uuid=club.uuid, today=date.today()))
+
+
+def _legacy(members, today) -> bytes:
+    return JSONRenderer().render([MemberSerializer(m, context={'today': today}).data for m in members])
+
+
+def _compiled(members, today) -> bytes:
+    return render_json([MemberSerializer.represent(m, {'today': today}) for m in members])
+
+
+def test_compiled_members_are_byte_identical(club):
+    today = date.today()
+    members = _members(club)
+
+    assert _compiled(members, today) == _legacy(members, today)
+
+
+def test_compiled_payments_subscriptions_and_courses_are_byte_identical(club):
+    member = _members(club)[0]
+    payments = member.get_unused_payments()
+    subscriptions = member.get_unexpired_subscriptions(date.today())
+
+    for serializer, instances in [(PaymentSerializer, payments),
+                                  (SubscriptionSerializer, subscriptions),
+                                  (CourseSerializer, member.courses)]:
+        assert render_json([serializer.represent(i) for i in instances]) == \
+            JSONRenderer().render([serializer(i).data for i in instances])
+
+
+def test_render_json_matches_drf_renderer():
+    data = {
+        'text': 'Émile     "quoted" \\ ☯',
+        'uuid': uuid4(),
+        'date': date(2023, 1, 2),
+        'time': datetime(2023, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        'nested': [{'n': 1, 'f': 1.5, 'b': True, 'none': None}],
+        'big': 2 ** 70,
+    }
+
+    assert render_json(data) == JSONRenderer().render(data)
+    assert render_json(None) == JSONRenderer().render(None)
+
+
+def test_render_json_rejects_nan_as_drf_renderer_does():
+    with pytest.raises(ValueError):
+        JSONRenderer().render({'f': float('nan')})
+
+    with pytest.raises(ValueError):
+        render_json({'f': float('nan')})
+
+
+@pytest.mark.benchmark
+def test_benchmark_compiled_against_drf_serialisation(club, timed):
+    today = date.today()
+    members = _members(club)
+
+    # When I serialise the members with DRF and with the compiled representation
+    legacy = timed(lambda: _legacy(members, today))
+    compiled = timed(lambda: _compiled(members, today))
+
+    # Then the compiled representation is faster
+    assert compiled < legacy
@@ -0,0 +1,89 @@
+import pytest
+
+from sjcadmin.sjcadmin.models import Student, Tenant
+
+NAMES = ['Carol', 'alice', 'Bob', 'Bob', None, 'Dave', 'Bob', 'Erin']
+
+
+@pytest.fixture
+def members(club, course):
+    for name in NAMES:
+        member = Student.objects.create(
+            profile_name=name, allowed_trial_sessions=2, club=club)
+        member.sign_up(course)
+        member.save()
+
+    # A member of another club, who must never be returned
+    other = Tenant.objects.create(name='Other club')
+    Student.objects.create(profile_name='Alice', allowed_trial_sessions=2, club=other)
+
+
+def _query(client, **data):
+    return client.post('/api/members/query', data, content_type='application/json')
+
+
+def test_query_pages_through_members_by_name(members, staff_client):
+    # Given I have the full member list in one response
+    everyone = _query(staff_client).json()
+
+    # When I page through the members 3 at a time
+    pages, cursor = [], None
+    while True:
+        response = _query(staff_client, limit=3, **({'cursor': cursor} if cursor else {}))
+        assert response.status_code == 200
+        pages.append(response.json()['members'])
+        cursor = response.json()['next']
+        if cursor is None:
+            break
+
+    # Then every member is returned exactly once, in pages of at most 3
+    assert [len(p) for p in pages] == [3, 3, 2]
+    assert [m['uuid'] for p in pages for m in p] == [m['uuid'] for m in everyone]
+
+    # And members are ordered by name, with unnamed members first
+    names = [m['name'] for p in pages for m in p]
+    assert names[0] is None
+    assert names.index('Carol') < names.index('Dave') < names.index('Erin')
+
+
+def test_query_pagination_keeps_filters(members, staff_client):
+    # When I page through members filtered by name
+    first = _query(staff_client, name='bob', limit=2).json()
+    second = _query(staff_client, name='bob', limit=2, cursor=first['next']).json()
+
+    # Then only matching members are returned
+    assert [m['name'] for m in first['members']] == ['Bob', 'Bob']
+    assert [m['name'] for m in second['members']] == ['Bob']
+    assert second['next'] is None
+
+    # And the Bobs are ordered by UUID
+    uuids = [m['uuid'] for m in first['members'] + second['members']]
+    assert uuids == sorted(uuids)
+
+
+def test_query_rejects_invalid_cursor(members, staff_client):
+    # When I request a page with a cursor that was not issued by the server
+    response = _query(staff_client, limit=2, cursor='not-a-cursor')
+
+    # Then the request is rejected
+    assert response.status_code == 400
+
+
+def test_legacy_members_pages_through_club(members, staff_client):
+    # When I page through the legacy members listing 5 at a time
+    first = staff_client.get('/api/members', {'limit': 5}).json()
+    second = staff_client.get('/api/members', {'limit': 5, 'cursor': first['next']}).json()
+
+    # Then the whole club is returned across the two pages
+    assert len(first['members']) == 5
+    assert len(second['members']) == 3
+    assert second['next'] is None
+    assert len({m['uuid'] for m in first['members'] + second['members']}) == len(NAMES)
+
+
+def test_legacy_members_without_pagination(members, staff_client):
+    # When I request the legacy members listing without a page size
+    response = staff_client.get('/api/members')
+
+    # Then the whole club is returned as before
+    assert len(response.json()) == len(NAMES)
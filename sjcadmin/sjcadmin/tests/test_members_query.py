@@ -0,0 +1,52 @@
+from datetime import date, datetime, timedelta, timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.models import Student
+from sjcadmin.sjcadmin.models.student import Licence, Note, Payment, Subscription
+
+
+def _seed_members(club, courses, n: int):
+    today = date.today()
+    for i in range(n):
+        member = Student.objects.create(
+            profile_name=f'Member {i}',
+            profile_email=f'member{i}@example.com',
+            allowed_trial_sessions=0,
+            club=club,
+            licence=Licence.objects.create(number=i, expires=today + timedelta(days=365)),
+        )
+        for course in courses:
+            member.sign_up(course)
+            member.subscribe(Subscription.make('time', today + timedelta(days=30), course))
+            member.subscribe(Subscription.make('time', today - timedelta(days=30), course))
+            member.take_payment(Payment.make(datetime.now(timezone.utc), course))
+        member.add_note(Note.make('A note', None, datetime.now(timezone.utc)))
+        member.save()
+
+
+def _query(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post('/api/members/query', {}, content_type='application/json')
+    return response, len(queries)
+
+
+def test_members_query_uses_fixed_number_of_queries(club, courses, staff_client):
+    # Given the club has a few members with courses, payments and subscriptions
+    _seed_members(club, courses, 3)
+    response, few = _query(staff_client)
+
+    # Then each member's unexpired subscriptions are returned with their course
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert all(len(m['subscriptions']) == 2 for m in response.json())
+    assert all(s['course']['label'] in ('Monday', 'Tuesday')
+               for m in response.json() for s in m['subscriptions'])
+
+    # When the club grows
+    _seed_members(club, courses, 12)
+    response, many = _query(staff_client)
+
+    # Then the roster loads with the same number of queries
+    assert len(response.json()) == 15
+    assert many == few
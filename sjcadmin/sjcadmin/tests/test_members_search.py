@@ -0,0 +1,140 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.models import Student, Tenant
+
+NAMES = ['John Smith', 'Jane Smithson', 'Bob Jones', 'Alice Walker', 'Johnny Cash']
+
+
+@pytest.fixture
+def club(club):
+    Student.objects.bulk_create([Student(
+        profile_name=name,
+        profile_email=name.lower().replace(' ', '.') + '@example.com',
+        allowed_trial_sessions=2,
+        club=club,
+    ) for name in NAMES])
+    return club
+
+
+def _search(client, **params):
+    return client.get('/api/members/search', params)
+
+
+def test_search_ranks_closest_match_first(staff_client):
+    response = _search(staff_client, q='smith')
+
+    assert response.status_code == 200
+    names = [m['name'] for m in response.json()]
+    assert names[0] == 'John Smith'
+    assert 'Jane Smithson' in names
+    assert 'Alice Walker' not in names
+
+
+def test_search_matches_partial_words(staff_client):
+    response = _search(staff_client, q='joh')
+
+    names = [m['name'] for m in response.json()]
+    assert set(names) == {'John Smith', 'Johnny Cash'}
+
+
+def test_search_does_not_match_within_words(staff_client):
+    response = _search(staff_client, q='thso')
+
+    assert response.json() == []
+
+
+def test_search_matches_email(staff_client):
+    response = _search(staff_client, q='alice.walker@')
+
+    assert [m['name'] for m in response.json()] == ['Alice Walker']
+
+
+def test_search_returns_only_typeahead_fields(staff_client):
+    response = _search(staff_client, q='Bob Jones')
+
+    assert response.json() == [{
+        'uuid': str(Student.objects.get(profile_name='Bob Jones').uuid),
+        'name': 'Bob Jones',
+        'email': 'bob.jones@example.com',
+        'active': True,
+    }]
+
+
+def test_search_limits_results(staff_client):
+    response = _search(staff_client, q='example.com', limit=2)
+
+    assert len(response.json()) == 2
+
+
+def test_search_is_scoped_to_club(staff_client):
+    other = Tenant.objects.create(name='Other club')
+    Student.objects.create(profile_name='John Smith', allowed_trial_sessions=2, club=other)
+
+    response = _search(staff_client, q='John Smith')
+
+    assert len([m for m in response.json() if m['name'] == 'John Smith']) == 1
+
+
+def test_search_runs_a_single_query(staff_client):
+    with CaptureQueriesContext(connection) as queries:
+        _search(staff_client, q='smith')
+
+    member_queries = [q for q in queries.captured_queries if 'sjcadmin_student' in q['sql']]
+    assert len(member_queries) == 1
+    assert 'sjcadmin_payment' not in member_queries[0]['sql']
+
+
+@pytest.fixture
+def many_members(club):
+    # Enough members for the planner to prefer an index over scanning the club
+    Student.objects.bulk_create([Student(
+        profile_name=f'Member {i}',
+        profile_email=f'member{i}@example.com',
+        allowed_trial_sessions=2,
+        club=club,
+    ) for i in range(5000)])
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE sjcadmin_student')
+    return club
+
+
+def _explain(queryset) -> str:
+    # Sequential scans are discouraged as for a large club. The match is explained on its
+    # own, as with every member in one club the planner would rather filter the club index
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+def test_search_uses_the_trigram_indexes(many_members):
+    plan = _explain(Student.objects.filter(Student._resembles('smith')))
+
+    assert 'student_name_trgm_idx' in plan
+    assert 'student_email_trgm_idx' in plan
+    assert 'Seq Scan' not in plan
+
+
+def test_name_filter_uses_the_trigram_index(many_members):
+    plan = _explain(Student.objects.filter(profile_name__ilike_contains='smith'))
+
+    assert 'student_name_trgm_idx' in plan
+    assert 'Seq Scan' not in plan
+
+
+def test_name_filter_is_case_insensitive_and_literal(club):
+    Student.objects.create(profile_name='Ann 100% Smith_', allowed_trial_sessions=2, club=club)
+
+    def names(name):
+        return {s.profile_name for s in Student.fetch_query(club_uuid=club.uuid, name=name)}
+
+    assert names('SMITH') == {'John Smith', 'Jane Smithson', 'Ann 100% Smith_'}
+    assert names('0% s') == {'Ann 100% Smith_'}
+    assert names('h_') == {'Ann 100% Smith_'}
+
+
+@pytest.mark.parametrize('params', [{}, {'q': ''}, {'q': 'smith', 'limit': 0}, {'q': 'smith', 'limit': 1000}])
+def test_search_rejects_invalid_query(staff_client, params):
+    assert _search(staff_client, **params).status_code == 400
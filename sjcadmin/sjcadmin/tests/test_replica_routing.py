@@ -0,0 +1,106 @@
+import base64
+import os
+import pytest
+
+from jose import jwt
+from time import time
+
+from sjcadmin.sjcadmin import routers
+from sjcadmin.sjcadmin.models import Course, Student
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """The database each read of a club model was routed to."""
+    routed = []
+    db_for_read = routers.ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        db = db_for_read(self, model, **hints)
+        if model in (Course, Student):
+            routed.append(db)
+        return db
+
+    monkeypatch.setattr(routers.ReplicaRouter, 'db_for_read', spy)
+    return routed
+
+
+@pytest.fixture
+def bearer(staff):
+    """Headers authenticating as staff by token, as the SPA does, with no session cookie."""
+    token = jwt.encode({
+        'userUuid': str(staff.uuid),
+        'expires': time() + 60,
+    }, base64.b64decode(os.getenv('PRIV_KEY')), algorithm='RS256')
+    return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+
+def test_router_reads_from_primary_by_default():
+    router = routers.ReplicaRouter()
+
+    assert router.db_for_read(Student) == 'default'
+
+    with routers.replica_reads():
+        assert router.db_for_read(Student) == 'replica'
+        assert router.db_for_write(Student) == 'default'
+
+
+def test_router_migrates_primary_only():
+    router = routers.ReplicaRouter()
+
+    assert router.allow_migrate('default', 'sjcadmin')
+    assert not router.allow_migrate('replica', 'sjcadmin')
+
+
+def test_read_only_views_read_from_replica(staff_client, reads):
+    staff_client.get('/api/courses')
+    staff_client.post('/api/members/query', {}, content_type='application/json')
+    staff_client.get('/api/members')
+
+    assert reads and set(reads) == {'replica'}
+
+
+def test_read_only_post_does_not_pin_session_to_primary(staff_client, reads):
+    staff_client.post('/api/members/query', {}, content_type='application/json')
+    staff_client.get('/api/courses')
+
+    assert set(reads) == {'replica'}
+
+
+def test_session_reads_own_writes_from_primary(staff_client, reads):
+    response = staff_client.post('/api/courses/create', {
+        'label': 'Monday', 'days': [0],
+    }, content_type='application/json')
+    assert response.status_code == 200
+    reads.clear()
+
+    response = staff_client.get('/api/courses')
+
+    assert [c['label'] for c in response.json()] == ['Monday']
+    assert reads and set(reads) == {'default'}
+
+
+def test_session_returns_to_replica_after_stickiness_expires(staff_client, reads, settings):
+    settings.REPLICA_STICKINESS_SECONDS = 0
+    staff_client.post('/api/courses/create', {
+        'label': 'Monday', 'days': [0],
+    }, content_type='application/json')
+    reads.clear()
+
+    staff_client.get('/api/courses')
+
+    assert set(reads) == {'replica'}
+
+
+def test_token_client_reads_own_writes_from_primary(client, bearer, reads):
+    response = client.post('/api/courses/create', {
+        'label': 'Monday', 'days': [0],
+    }, content_type='application/json', **bearer)
+    assert response.status_code == 200
+    client.cookies.clear()
+    reads.clear()
+
+    response = client.get('/api/courses', **bearer)
+
+    assert [c['label'] for c in response.json()] == ['Monday']
+    assert reads and set(reads) == {'default'}
@@ -0,0 +1,124 @@
+import humps
+import pytest
+
+from rest_framework import serializers
+
+from sjcadmin.sjcadmin.schemas import BaseSerialiser, CourseSerializer
+
+ROUNDS = 2000
+
+
+class AddressSerializer(BaseSerialiser):
+    address_line_1 = serializers.CharField()
+    post_code = serializers.CharField()
+
+
+class ProfileSerializer(BaseSerialiser):
+    first_name = serializers.CharField()
+    date_of_birth = serializers.DateField(required=False)
+    home_address = AddressSerializer()
+    previous_addresses = AddressSerializer(many=True)
+    courses = CourseSerializer(many=True)
+    emergency_contacts = serializers.ListField(child=serializers.DictField())
+    extra_details = serializers.JSONField()
+    display_name = serializers.SerializerMethodField()
+
+    def get_display_name(self, obj):
+        return obj['first_name'].lower() + '_name'
+
+
+class MembershipSerializer(BaseSerialiser):
+    member_name = serializers.CharField()
+    email_address = serializers.CharField()
+    phone_number = serializers.CharField()
+    date_of_birth = serializers.DateField()
+    join_date = serializers.DateField()
+    remaining_trial_sessions = serializers.IntegerField()
+    payment_option = serializers.CharField()
+    licence_expiry_date = serializers.DateField()
+
+
+MEMBERSHIP = {
+    'memberName': 'Carol', 'emailAddress': 'carol@example.com', 'phoneNumber': '0123',
+    'dateOfBirth': '1990-01-01', 'joinDate': '2023-01-01', 'remainingTrialSessions': 2,
+    'paymentOption': 'now', 'licenceExpiryDate': '2024-01-01',
+}
+
+PROFILE = {
+    'first_name': 'Émile',
+    'date_of_birth': None,
+    'home_address': {'address_line_1': '1 High Street', 'post_code': 'SO14 1AA'},
+    'previous_addresses': [{'address_line_1': '2 Low Street', 'post_code': 'SO15 2BB'}],
+    'courses': [{'uuid': '9b2e7d9e-7d0f-4f4a-a6a1-1f0b4b6f2c11', 'label': 'Monday'}],
+    'emergency_contacts': [{'contact_name': 'Carol', 'phone_number': '0123'}],
+    'extra_details': {'belt_colour': 'blue', 'past_clubs': [{'club_name': 'Other'}]},
+}
+
+CAMEL_PROFILE = humps.camelize({k: v for k, v in PROFILE.items() if k != 'date_of_birth'})
+
+
+def _legacy_representation(instance) -> dict:
+    """The previous outbound conversion, which camelized every result recursively."""
+    return humps.camelize(serializers.Serializer.to_representation(ProfileSerializer(), instance))
+
+
+def _legacy_snake_case(data):
+    """The previous inbound conversion, which rebuilt each top-level key character by character."""
+    return {''.join(['_' + i.lower() if i.isupper() else i for i in key]).lstrip('_'): value
+            for key, value in data.items()}
+
+
+def test_key_tables_are_built_when_the_class_is_defined():
+    assert ProfileSerializer._camel_keys['home_address'] == 'homeAddress'
+    assert AddressSerializer._snake_keys['addressLine1'] == 'address_line_1'
+    assert ProfileSerializer._nested == {'home_address', 'previous_addresses', 'courses'}
+
+
+def test_representation_matches_recursive_camelize():
+    assert ProfileSerializer(PROFILE).data == _legacy_representation(PROFILE)
+    assert ProfileSerializer.represent(PROFILE) == _legacy_representation(PROFILE)
+
+
+def test_representation_leaves_string_values_alone():
+    assert ProfileSerializer(PROFILE).data['displayName'] == 'émile_name'
+    assert ProfileSerializer.represent(PROFILE)['displayName'] == 'émile_name'
+
+
+def test_internal_value_converts_nested_dicts_and_lists():
+    serializer = ProfileSerializer(data=CAMEL_PROFILE)
+
+    assert serializer.is_valid(), serializer.errors
+    assert serializer.validated_data['home_address'] == {'address_line_1': '1 High Street', 'post_code': 'SO14 1AA'}
+    assert serializer.validated_data['previous_addresses'][0]['address_line_1'] == '2 Low Street'
+    assert serializer.validated_data['emergency_contacts'] == [{'contact_name': 'Carol', 'phone_number': '0123'}]
+    assert serializer.validated_data['extra_details'] == {'belt_colour': 'blue', 'past_clubs': [{'club_name': 'Other'}]}
+
+
+def test_internal_value_accepts_snake_case_keys():
+    serializer = AddressSerializer(data={'address_line_1': '1 High Street', 'post_code': 'SO14 1AA'})
+
+    assert serializer.is_valid(), serializer.errors
+
+
+@pytest.mark.benchmark
+def test_benchmark_outbound_key_translation(timed):
+    serializer = ProfileSerializer()
+
+    # When I represent a profile with recursive camelize and with the key tables
+    legacy = timed(lambda: _legacy_representation(PROFILE), rounds=ROUNDS)
+    current = timed(lambda: serializer.to_representation(PROFILE), rounds=ROUNDS)
+
+    # Then the key tables are faster
+    assert current < legacy
+
+
+@pytest.mark.benchmark
+def test_benchmark_inbound_key_translation(timed):
+    serializer = MembershipSerializer()
+
+    # When I convert a request's keys character by character and with the key tables
+    legacy = timed(lambda: _legacy_snake_case(MEMBERSHIP), rounds=ROUNDS)
+    current = timed(lambda: serializer.camelize_keys_to_snake_case(MEMBERSHIP), rounds=ROUNDS)
+
+    # Then the key tables are faster
+    assert current < legacy
@@ -0,0 +1,113 @@
+import pytest
+
+from datetime import datetime, timedelta, timezone
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.models import Course, Student
+from sjcadmin.sjcadmin.models.student import Note, Payment
+
+MEMBERS = 40
+YEARS_OF_PAYMENTS = 3
+
+
+@pytest.fixture
+def club(club):
+    """A club whose members have paid weekly for several years."""
+    course = Course.objects.create(
+        _label='Monday', _days=[0], tenant_uuid=club.uuid)
+
+    members = Student.objects.bulk_create([Student(
+        profile_name=f'Member {i}',
+        profile_email=f'member{i}@example.com',
+        allowed_trial_sessions=2,
+        club=club,
+    ) for i in range(MEMBERS)])
+    for member in members:
+        member._courses.add(course)
+
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    Payment.objects.bulk_create([Payment(
+        _student=member,
+        _course=course,
+        _datetime=start + timedelta(weeks=w),
+        _used=w >= 2,
+    ) for member in members for w in range(YEARS_OF_PAYMENTS * 52)])
+    Note.objects.bulk_create([Note(
+        _student=member,
+        _text='A note',
+        _datetime=start,
+    ) for member in members])
+
+    return club
+
+
+def _legacy_fetch_query(club_uuid):
+    """The previous loader, which prefetched every payment and split them in Python."""
+    queryset = Student.objects\
+        .select_related('licence')\
+        .prefetch_related('note_set')\
+        .prefetch_related(models.Prefetch('payment_set', queryset=Payment.objects.order_by('-_datetime')))\
+        .prefetch_related('subscription_set')\
+        .annotate(_counted_attendance=models.Count('attendance'))\
+        .prefetch_related('_courses')\
+        .filter(club__uuid=club_uuid)
+
+    for o in queryset:
+        payments = o.payment_set.all()
+        o._unused_payments = [p for p in payments if not p.used]
+        o._used_payments = [p for p in payments if p.used]
+        o._unused_and_new_payments = o._unused_payments
+        o._notes = list(o.note_set.all())
+        o._existing_courses = list(o._courses.all())
+
+    return queryset
+
+
+def _roster(members):
+    return sorted((m.name,
+                   [(p.time, p.course.uuid) for p in m.get_unused_payments()],
+                   [c.uuid for c in m.courses],
+                   m.has_notes) for m in members)
+
+
+def test_fetch_query_loads_only_unused_payments(club):
+    # When I load the club's members
+    with CaptureQueriesContext(connection) as queries:
+        members = list(Student.fetch_query(club_uuid=club.uuid))
+        roster = _roster(members)
+
+    # Then they match what the previous loader produced
+    assert roster == _roster(_legacy_fetch_query(club.uuid))
+
+    # And each member only has their unused payments loaded
+    assert all(len(m.get_unused_payments()) == 2 for m in members)
+
+    # And the number of queries does not depend on the number of members
+    assert len(queries) == 5
+
+
+def test_get_last_payments_limits_used_payments(club):
+    # Given I have loaded a member
+    member = Student.fetch_query(club_uuid=club.uuid)[0]
+
+    # When I request their last 30 payments
+    with CaptureQueriesContext(connection) as queries:
+        payments = member.get_last_payments(30)
+
+    # Then only the 30 most recent used payments are fetched, in one query
+    assert len(queries) == 1
+    assert len(payments) == 30
+    assert all(p.used for p in payments)
+    assert [p.time for p in payments] == sorted(
+        (p.time for p in payments), reverse=True)
+
+
+@pytest.mark.benchmark
+def test_benchmark_fetch_query_against_legacy_loader(club, timed):
+    # When I load the roster with the previous and the current loader
+    legacy = timed(lambda: _roster(_legacy_fetch_query(club.uuid)))
+    current = timed(lambda: _roster(Student.fetch_query(club_uuid=club.uuid)))
+
+    # Then the current loader is faster
+    assert current < legacy
@@ -0,0 +1,129 @@
+import pytest
+
+from datetime import date, datetime, timedelta, timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.models import Student
+from sjcadmin.sjcadmin.models.student import Licence, Note, Payment
+from sjcadmin.sjcauth.models import User
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+@pytest.fixture
+def member(club, course):
+    """A licenced member with a history of payments, a few of them unused."""
+    member = Student.objects.create(
+        profile_name='Member',
+        profile_email='member@example.com',
+        allowed_trial_sessions=0,
+        club=club,
+        licence=Licence.objects.create(
+            number=1, expires=date.today() + timedelta(days=365)),
+    )
+    member._courses.add(course)
+
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    Payment.objects.bulk_create([Payment(
+        _student=member, _course=course, _datetime=start + timedelta(weeks=w), _used=w < 50,
+    ) for w in range(55)])
+    Note.objects.bulk_create([Note(
+        _student=member, _text='A note', _datetime=start, _author=None,
+    ) for _ in range(5)])
+    return member
+
+
+def _writes(queries) -> list[str]:
+    return [q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith(WRITES) and '"sjcadmin_' in q['sql'] and '"sjcadmin_memberroster"' not in q['sql']]
+
+
+def test_saving_unchanged_member_writes_nothing(member):
+    m = Student.fetch_by_uuid(member.uuid)
+
+    with CaptureQueriesContext(connection) as queries:
+        m.save()
+
+    assert _writes(queries) == []
+
+
+def test_changing_a_field_updates_only_that_column(staff_client, member):
+    with CaptureQueriesContext(connection) as queries:
+        response = staff_client.post(f'/api/members/{member.uuid}/deactivate')
+
+    assert response.status_code == 200
+    writes = _writes(queries)
+    assert len(writes) == 1
+    assert writes[0].startswith('UPDATE "sjcadmin_student" SET "active" = false WHERE')
+    assert not Student.objects.get(pk=member.pk).active
+
+
+def test_logging_paid_attendance_writes_only_what_changed(staff_client, course, member):
+    with CaptureQueriesContext(connection) as queries:
+        response = staff_client.post(f'/api/members/{member.uuid}/attendance/log', {
+            'course': {'uuid': str(course.uuid)},
+            'date': date.today().isoformat(),
+            'payment': 'paid',
+            'payment_option': 'advance',
+        }, content_type='application/json')
+
+    assert response.status_code == 200
+    tables = [w.split('"')[1] for w in _writes(queries)]
+    # Attendance row, the payment it used and the member's attended sessions counter
+    assert sorted(tables) == ['sjcadmin_attendance', 'sjcadmin_payment', 'sjcadmin_student']
+    assert Payment.objects.filter(_student=member, _used=False).count() == 4
+
+
+def test_adding_payment_inserts_only_the_payment(staff_client, course, member):
+    with CaptureQueriesContext(connection) as queries:
+        response = staff_client.post(f'/api/members/{member.uuid}/payments/add', {
+            'course': {'uuid': str(course.uuid)},
+        }, content_type='application/json')
+
+    assert response.status_code == 200
+    writes = _writes(queries)
+    assert len(writes) == 1
+    assert writes[0].startswith('INSERT INTO "sjcadmin_payment"')
+
+
+def test_adding_licence_links_it_to_member(staff_client, club):
+    member = Student.objects.create(
+        profile_name='Trial member', allowed_trial_sessions=2, club=club)
+
+    response = staff_client.post(f'/api/members/{member.uuid}/licences/add', {
+        'number': 123, 'expiryDate': (date.today() + timedelta(days=365)).isoformat(),
+    }, content_type='application/json')
+
+    assert response.status_code == 200
+    assert Student.objects.get(pk=member.pk).licence.number == 123
+
+
+def test_saving_twice_does_not_rewrite_children(club, course):
+    creator = User.objects.create_user('creator@example.com', tenant_uuid=club.uuid)
+    member = Student.make(name='New member', creator=creator)
+    member.club = club
+    member.add_note(Note.make('Joined', author=creator.uuid, datetime=datetime.now(timezone.utc)))
+    member.take_payment(Payment.make(datetime.now(timezone.utc), course))
+    member.sign_up(course)
+    member.save()
+
+    with CaptureQueriesContext(connection) as queries:
+        member.save()
+
+    assert _writes(queries) == []
+    assert Note.objects.filter(_student=member).count() == 1
+    assert Payment.objects.filter(_student=member).count() == 1
+    assert list(member._courses.all()) == [course]
+
+
+def test_members_do_not_share_child_lists(course):
+    first, second = Student(), Student()
+
+    first.take_payment(Payment.make(datetime.now(timezone.utc), course))
+    first.add_note(Note.make('A note', author=None, datetime=datetime.now(timezone.utc)))
+    first.sign_up(course)
+
+    assert second.get_unused_payments() == []
+    assert not second.has_notes
+    assert second.courses == []
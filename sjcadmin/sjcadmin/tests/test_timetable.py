@@ -0,0 +1,83 @@
+import pytest
+
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from sjcadmin.sjcadmin.models import Course
+
+# A Monday to the following Sunday
+WEEK = {'start': '2023-01-02', 'end': '2023-01-08'}
+
+
+@pytest.fixture
+def club(club):
+    Course.objects.create(_label='Monday and Thursday', _days=[0, 3], tenant_uuid=club.uuid)
+    Course.objects.create(_label='Seminar', _days=[], dates=[date(2023, 1, 3), date(2023, 2, 1)],
+                          tenant_uuid=club.uuid)
+    Course.objects.create(_label='Other club', _days=[0], tenant_uuid=None)
+    return club
+
+
+def _sessions(response) -> list[tuple[str, str]]:
+    return [(s['date'], s['course']['label']) for s in response.json()]
+
+
+def test_timetable_lists_every_session_of_the_club_in_the_range(staff_client):
+    response = staff_client.get('/api/courses/timetable', WEEK)
+
+    assert response.status_code == 200
+    assert _sessions(response) == [
+        ('2023-01-02', 'Monday and Thursday'),
+        ('2023-01-03', 'Seminar'),
+        ('2023-01-05', 'Monday and Thursday'),
+    ]
+    assert 'private' in response['Cache-Control']
+    assert response['ETag']
+
+
+def test_timetable_is_not_modified_while_the_courses_are_unchanged(staff_client):
+    etag = staff_client.get('/api/courses/timetable', WEEK)['ETag']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = staff_client.get('/api/courses/timetable', WEEK, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert not any('"sjcadmin_course"' in q['sql'] for q in queries.captured_queries)
+
+
+def test_timetable_is_served_from_the_cache(staff_client):
+    first = staff_client.get('/api/courses/timetable', WEEK)
+
+    with CaptureQueriesContext(connection) as queries:
+        second = staff_client.get('/api/courses/timetable', WEEK)
+
+    assert second.content == first.content
+    assert not any('"sjcadmin_course"' in q['sql'] for q in queries.captured_queries)
+
+
+def test_timetable_changes_when_a_course_is_created_or_deleted(staff_client):
+    etag = staff_client.get('/api/courses/timetable', WEEK)['ETag']
+
+    created = staff_client.post('/api/courses/create', {'label': 'Saturday', 'days': [5]},
+                                content_type='application/json').json()
+    response = staff_client.get('/api/courses/timetable', WEEK, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert ('2023-01-07', 'Saturday') in _sessions(response)
+
+    staff_client.post(f"/api/courses/{created['uuid']}/delete")
+    response = staff_client.get('/api/courses/timetable', WEEK, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    assert response.status_code == 200
+    assert ('2023-01-07', 'Saturday') not in _sessions(response)
+
+
+@pytest.mark.parametrize('query', [
+    {},
+    {'start': '2023-01-08', 'end': '2023-01-02'},
+    {'start': '2023-01-01', 'end': '2024-01-02'},
+])
+def test_timetable_rejects_invalid_ranges(staff_client, query):
+    assert staff_client.get('/api/courses/timetable', query).status_code == 400
@@ -18,8 +18,12 @@ urlpatterns = [
     path('api/members/<uuid:member_uuid>', api_members.member),
     path('api/members/<uuid:member_uuid>/delete', api_members.delete),
     path('api/members/query', api_members.query),
+    path('api/members/manageable', api_members.manageable),
+    path('api/members/search', api_members.search),
     path('api/members/create', api_members.create),
 
+    path('api/members/attendance/log', api_members.log_attendances),
+    path('api/members/attendance/delete', api_members.delete_attendances),
     path('api/members/<uuid:member_uuid>/attendance/log',
          api_members.log_attendance),
     path('api/members/<uuid:member_uuid>/attendance/delete',
@@ -37,7 +41,9 @@ urlpatterns = [
 
     path('api/courses', api_courses.courses),
     path('api/courses/create', api_courses.create),
+    path('api/courses/timetable', api_courses.timetable),
     path('api/courses/<uuid:pk>/delete', api_courses.delete_course),
+    path('api/courses/<uuid:pk>/register', api_courses.register),
     path('api/courses/<uuid:pk>', api_courses.get_course),
 
     # Legacy routes
@@ -1,3 +1,4 @@
 poetry run ./manage.py migrate --database default
+poetry run ./manage.py rebuild_member_roster --missing
 
 poetry run gunicorn --workers 4 --reload sjcadmin.wsgi:application -b 0.0.0.0:8000
@@ -66,10 +66,27 @@ def _delete_by_criteria(payload: dict):
         logger.info(f"Error while POSTting message to {api_url}: {str(e)}")
 
 
+def _cascade(payload: dict):
+    api_url = f"{API_ROOT}/attendance/cascade"
+
+    try:
+        response = requests.post(api_url, json=payload, headers={
+                                 'Authorization': f'Bearer {API_KEY}'})
+
+        if response.status_code == 204:
+            logger.info(f"Successfully POST message to {api_url}")
+        else:
+            logger.info(
+                f"Failed to POST message to {api_url}. Status code: {response.status_code}")
+    except Exception as e:
+        logger.info(f"Error while POSTting message to {api_url}: {str(e)}")
+
+
 def consumer(event, context):
     router = {
         'create': _create,
         'delete': _delete_by_criteria,
+        'cascade': _cascade,
     }
 
     for record in event['Records']: